@@ -1,57 +1,17 @@
-import numpy as np
 from collections import Counter
 import streamlit as st
 import json
-from scheduler.core import generate_schedule
-import matplotlib.pyplot as plt
-import os
-from datetime import datetime, timedelta
-import matplotlib.dates as mdates
-
-SAVE_DIR = os.path.join("data")
-SAVE_PATH = os.path.join(SAVE_DIR, "saved_tasks.json")
-os.makedirs(SAVE_DIR, exist_ok=True)
-TODAY_SCHEDULE_PATH = os.path.join(SAVE_DIR, f"schedule_{datetime.now().strftime('%Y%m%d')}.json")
-
-#Gantt Style Task timeline function
-def plot_task_timeline(schedule):
-    fig, ax = plt.subplots(figsize = (10,4))
-    
-    base_time = datetime.strptime("08:00", "%H:%M") #Starting time for display
-    for idx, task in enumerate(schedule):
-        start = datetime.strptime(task["start"], "%H:%M")
-        end = datetime.strptime(task["end"], "%H:%M")
-        ax.barh(task["task"], (end - start).seconds/3600, left=(start - base_time).seconds/3600)
-    
-    ax.set_xlabel("Hours of Day")
-    ax.set_ylabel("Tasks")
-    ax.set_title("Task timeline")
-    ax.xaxis.set_major_locator(mdates.HourLocator(interval=1))
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
-    st.pyplot(fig, use_container_width=True)
-
-def save_tasks(tasks):
-    data = {
-        "tasks": tasks,
-        "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    }
-    with open(SAVE_PATH, "w") as f:
-        json.dump({
-            "tasks": tasks,
-            "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }, f, indent=2)
+from datetime import date, timedelta
+from scheduler.timeline import entry_hours, parse_clock
+from utils.plot_utils import pie_data, plot_task_timeline, show_chart, type_hours_data
+from utils.task_index import TaskIndex
+from utils.file_utils import clear_tasks, load_tasks, load_today_schedule, save_tasks, save_today_schedule
 
+# numpy and matplotlib are only imported once a schedule or chart is needed, keeping cold starts fast
 
-def load_tasks():
-    if os.path.exists(SAVE_PATH):
-        with open(SAVE_PATH, "r") as f:
-            data = json.load(f)
-            return data.get("tasks", []), data.get("last_updated", "Unknown")
-    return [], "Unknown"
+TASK_TYPES = ["Study", "Work", "Health", "Personal", "Creative"]
+ENERGY_LEVELS = ["high", "medium", "low"]
 
-def save_today_schedule(schedule):
-    with open(TODAY_SCHEDULE_PATH, "w") as f:
-        json.dump(schedule, f, indent=2)
 
 def format_schedule_text(schedule):
     lines = ["Your optimized schedule:\n"]
@@ -59,6 +19,163 @@ def format_schedule_text(schedule):
         lines.append(f"{s['start']} - {s['end']}: {s['task']} ({s['energy']})")
     return "\n".join(lines)
 
+
+#Task widgets; editing one reruns only this section, the rest of the page reads the values on its next run
+@st.fragment
+def task_inputs(task_count, loaded_tasks):
+    for i in range(task_count):
+        if i<len(loaded_tasks):
+            default = loaded_tasks[i]
+        else:
+            default = {}
+
+        col1, col2 = st.columns([5, 1])
+        with col1.expander(f"Task{i+1}"):
+            st.text_input(f"Name {i+1}", value= default.get("name", ""), key=f"name{i}")
+            st.slider(f"Duration (hrs) {i+1}", 0.25, 4.0, float(default.get("duration", 1)), step=0.25, key=f"dur{i}")
+            st.slider(f"Priority (1=Low, 5=High) {i+1}", 1, 5, default.get("priority", 3), key=f"pri{i}")
+            st.selectbox(f"Type {i+1}", TASK_TYPES, index=TASK_TYPES.index(default.get("type", "Study")), key=f"type{i}")
+            st.selectbox(f"Energy Requirement {i+1}", ENERGY_LEVELS, index=ENERGY_LEVELS.index(default.get("energy", "medium")), key=f"en{i}")
+            st.text_input(f"Tags (comma separated) {i+1}", value=",".join(default.get("tags", [])), key=f"tags{i}")
+
+        with col2:
+            if st.button("X", key=f"del{i}"):
+                st.session_state["deleted_task_ids"] = st.session_state.get("deleted_task_ids", set())
+                st.session_state["deleted_task_ids"].add(i)
+                st.rerun()
+
+
+def read_tasks(task_count):
+    tasks = []
+    deleted = st.session_state.get("deleted_task_ids", set())
+    for i in range(task_count):
+        name = st.session_state.get(f"name{i}", "")
+        if name and i not in deleted:
+            tags_input = st.session_state.get(f"tags{i}", "")
+            tasks.append({
+                "name": name,
+                "duration": st.session_state[f"dur{i}"],
+                "priority": st.session_state[f"pri{i}"],
+                "type": st.session_state[f"type{i}"],
+                "energy": st.session_state[f"en{i}"],
+                "tags" : [tag.strip() for tag in tags_input.split(",") if tag.strip()]
+            })
+    return tasks
+
+
+def dashboard_state(schedule, tasks, selected_types, selected_tags, available_hours, focus_tag, task_index):
+    """
+    Everything the dashboard shows that is derived from the schedule and the filters.
+    """
+    from utils.task_utils import filter_schedule_by_type_and_tags, get_smart_suggestions
+
+    filtered_schedule = filter_schedule_by_type_and_tags(schedule, selected_types, selected_tags)
+    scheduled = {s["task"] for s in filtered_schedule}
+    task_priority = {t["name"]: t["priority"] for t in reversed(tasks)}
+
+    priorities = [task['priority'] for task in tasks if task['name'] in scheduled]
+    type_counts = Counter(s['task_type'] for s in filtered_schedule)
+    type_duration = {}
+    for s in filtered_schedule:
+        type_duration[s["task_type"]] = type_duration.get(s["task_type"], 0) + entry_hours(s)
+    priority_map = {s['task']: task_priority.get(s["task"], 0) for s in filtered_schedule}
+
+    total_duration = sum(entry_hours(s) for s in filtered_schedule)
+    unused_time = available_hours - total_duration
+    suggestions = []
+    if unused_time > 0:
+        from scheduler.gaps import fill_gaps
+
+        # Best sets of remaining tasks that fit together in the free time, not just one by one
+        remaining_tasks = get_smart_suggestions(task_index, {s["task"] for s in schedule}, unused_time, focus_tag)
+        suggestions = fill_gaps(remaining_tasks, schedule, available_hours, k=5)
+
+    return {
+        "filtered_schedule": filtered_schedule,
+        "energy_counts": Counter(s['energy'] for s in filtered_schedule),
+        "avg_priority": sum(priorities) / len(priorities) if priorities else 0,
+        "most_common_type": type_counts.most_common(1)[0][0] if type_counts else "N/A",
+        "total_duration": total_duration,
+        "max_type": max(type_duration.items(), key=lambda x: x[1])[0] if type_duration else "N/A",
+        "max_priority_task": max(priority_map.items(), key = lambda x: x[1])[0] if priority_map else "None",
+        "completion_percent": round((total_duration/ available_hours) * 100, 1) if available_hours else 0,
+        "unused_time": unused_time,
+        "suggestions": suggestions,
+        "pie": pie_data(filtered_schedule),
+        "type_hours": type_hours_data(filtered_schedule),
+        "schedule_text": format_schedule_text(filtered_schedule),
+        **history_insights(schedule, tasks, available_hours),
+    }
+
+
+def history_insights(schedule, tasks, available_hours):
+    """
+    Today's productivity score next to what past days predict, and last week's utilization.
+    """
+    import numpy as np
+    from utils.file_utils import get_history
+    from utils.history import productivity_score
+
+    history = get_history()
+    task_priority = {t["name"]: t["priority"] for t in reversed(tasks)}
+    hours_used = sum(entry_hours(s) for s in schedule)
+    weighted_hours = sum(task_priority.get(s["task"], 0) * entry_hours(s) for s in schedule)
+    today = date.today()
+    last_week = history.daily(today - timedelta(days=7), today)["utilization"]
+    return {
+        "productivity_score": float(productivity_score(weighted_hours, hours_used, available_hours)),
+        "predicted_score": history.predict_score(today, available_hours),
+        "week_utilization": float(np.nanmean(last_week)) if np.any(~np.isnan(last_week)) else None,
+    }
+
+
+#Edits in the table rerun only this section until they are applied
+@st.fragment
+def manual_adjustments(filtered_schedule):
+    st.subheader("Manual Adjustments (Drag to reorder)")
+
+    for idx, task in enumerate(filtered_schedule):
+        task["order"] = idx
+
+    edited_schedule = st.data_editor(filtered_schedule,
+                                     column_order=["order", "start", "end", "task", "energy", "task_type", "tags"],
+                                     use_container_width=True, num_rows="fixed")
+
+    if st.button("Apply Manual Edits and Save"):
+        #Only the "H:MM" strings can be edited, so the minute fields are re-derived from them
+        try:
+            for entry in edited_schedule:
+                entry["start_minute"], entry["end_minute"] = parse_clock(entry["start"]), parse_clock(entry["end"])
+        except (AttributeError, ValueError):
+            st.error("Start and end times must look like 9:30.")
+            return
+        edited_schedule.sort(key = lambda x: x["order"])
+        save_today_schedule(edited_schedule)
+        st.session_state["schedule"] = edited_schedule
+        st.session_state["edits_applied"] = True
+        st.rerun()
+
+#Every slider value and focus tag at once; runs on its own so the rest of the page stays put
+@st.fragment
+def what_if(tasks):
+    st.subheader("What If")
+    if st.button("Compare hours and focus tags"):
+        from scheduler.sweep import sweep_schedules
+
+        focus_tags = [""] + sorted({tag for t in tasks for tag in t.get("tags", [])})
+        sweep = sweep_schedules(tasks, range(1, 15), focus_tags)
+        st.markdown("Best trade-offs between a packed day and total priority:")
+        st.dataframe([
+            {
+                "Hours": p["available_hours"],
+                "Focus Tag": p["focus_tag"] or "-",
+                "Hours Used": p["hours_used"],
+                "Utilized (%)": round(p["utilization"] * 100, 1),
+                "Total Priority": p["priority"],
+            }
+            for p in sweep["frontier"]
+        ], use_container_width=True)
+
 # -- Page Setup --
 st.set_page_config(page_title="Time Optimizer", layout="centered")
 st.title("Time Optimizer")
@@ -80,13 +197,11 @@ if st.sidebar.button("Load Last Saved Tasks"):
 
 # View today's schedule
 if st.sidebar.button("View Today’s Schedule"):
-    filter_options = ["All", "Study", "Work", "Health", "Personal", "Creative"]
+    filter_options = ["All"] + TASK_TYPES
     selected_type = st.sidebar.selectbox("Filter by Task Type", filter_options)
-    
-    if os.path.exists(TODAY_SCHEDULE_PATH):
-        with open(TODAY_SCHEDULE_PATH, "r") as f:
-            today_schedule = json.load(f)
-        
+
+    today_schedule = load_today_schedule()
+    if today_schedule:
         if selected_type != "All":
             filtered_schedule = [task for task in today_schedule if task["type"].lower() == selected_type.lower()]
         else:
@@ -103,40 +218,8 @@ task_count = st.number_input("Number of tasks", min_value=1, max_value=10, value
 
 # -- Task Input Section --
 st.markdown("Available Time and Task Details")
-tasks = []
-for i in range(task_count):
-    
-    loaded_tasks = loaded    
-    if i<len(loaded_tasks):
-        default = loaded_tasks[i]
-    else:
-        default = {}
-
-    col1, col2 = st.columns([5, 1])
-    with col1.expander(f"Task{i+1}"):
-        name = st.text_input(f"Name {i+1}", value= default.get("name", ""), key=f"name{i}")
-        duration = st.slider(f"Duration (hrs) {i+1}", 1, 4, default.get("duration", 1), key=f"dur{i}")
-        priority = st.slider(f"Priority (1=Low, 5=High) {i+1}", 1, 5, default.get("priority", 3), key=f"pri{i}")
-        task_type = st.selectbox(f"Type {i+1}", ["Study", "Work", "Health", "Personal", "Creative"], index=["Study", "Work", "Health", "Personal", "Creative"].index(default.get("type", "Study")), key=f"type{i}")
-        energy = st.selectbox(f"Energy Requirement {i+1}", ["high", "medium", "low"], index=["high", "medium", "low"].index(default.get("energy", "medium")), key=f"en{i}")
-        tags_input = st.text_input(f"Tags (comma separated) {i+1}", value=",".join(default.get("tags", [])), key=f"tags{i}")
-        tags = [tag.strip() for tag in tags_input.split(",") if tag.strip()]
-    
-    with col2:
-        if st.button("X", key=f"del{i}"):
-            st.session_state["deleted_task_ids"] = st.session_state.get("deleted_task_ids", set())
-            st.session_state["deleted_task_ids"].add(i)
-            st.rerun()
-        
-    if name and i not in st.session_state.get("deleted_task_ids", set()):
-        tasks.append({
-            "name": name,
-            "duration": duration,
-            "priority": priority,
-            "type": task_type,
-            "energy": energy,
-            "tags" : tags
-        })
+task_inputs(task_count, loaded)
+tasks = read_tasks(task_count)
 
 # -- Undo All Deletes Button --
 if "deleted_task_ids" in st.session_state and st.session_state["deleted_task_ids"]:
@@ -148,68 +231,73 @@ if "deleted_task_ids" in st.session_state and st.session_state["deleted_task_ids
 if st.button("Save Task List"):
     save_tasks(tasks)
     st.success("Tasks saved successfully!")
-    
+
 if st.button("Update Saved Tasks"):
     save_tasks(tasks)
     st.success("Saved tasks updated")
-    
+
 # -- Clear Button --
 if st.button("Clear Saved Tasks"):
-    if os.path.exists(SAVE_PATH):
-        os.remove(SAVE_PATH)
+    if load_tasks()[0]:
+        clear_tasks()
         st.success("Saved Tasks Cleared")
         st.session_state.pop("loaded_tasks", None)
         st.rerun()
-        
+
+# Inverted tag/type index over the task list, kept across reruns and only updated where tasks changed
+task_index = st.session_state.setdefault("task_index", TaskIndex())
+task_index.sync(tasks)
+
 task_types = sorted(set(task['type'] for task in tasks))
 selected_types = st.multiselect("Filter by Task Type", task_types, default=task_types)
 
 # -- Generate Schedule --
-focus_tag = st.text_input("Today's Focus Tag(optional)", "")    
+focus_tag = st.text_input("Today's Focus Tag(optional)", "")
 if st.button("Generate Schedule") and tasks:
-    schedule = generate_schedule(tasks, available_hours, focus_tag)
-    save_today_schedule(schedule)
-    st.success("Today's schedule saved!")
-    all_tags = sorted({tag for s in schedule for tag in s.get("tags", [])})
-    selected_tags = st.sidebar.multiselect("Filter by tags", all_tags, default = all_tags)
+    from scheduler.incremental import IncrementalPlanner
+
+    # Repair the previous schedule when only the task list changed, instead of replanning from scratch
+    planner = st.session_state.get("planner")
+    if planner and planner.available_hours == available_hours and planner.focus_tag == focus_tag:
+        schedule = planner.sync(tasks)
+    else:
+        planner = IncrementalPlanner(tasks, available_hours, focus_tag)
+        st.session_state["planner"] = planner
+        schedule = planner.schedule
     task_type_lookup = {t["name"]: t["type"] for t in tasks}
     task_tags_lookup = {t["name"]: t.get("tags", []) for t in tasks}
+    task_priority_lookup = {t["name"]: t["priority"] for t in tasks}
     for s in schedule:
         s["task_type"] = task_type_lookup.get(s["task"], "Unknown")
         s["tags"] = task_tags_lookup.get(s["task"], [])
-    
-    filtered_schedule = [
-    s for s in schedule
-    if s["task_type"] in selected_types and
-       (not selected_tags or any(tag in selected_tags for tag in s.get("tags", [])))
-    ]
-    
-    #Summary stats
-    energy_counts = Counter(s['energy'] for s in filtered_schedule)
-    type_counts = Counter(s['task_type'] for s in filtered_schedule)
-    priorities = [task['priority'] for task in tasks if task['name'] in [s['task'] for s in filtered_schedule]]
-    avg_priority = np.mean(priorities) if priorities else 0
-    most_common_type = type_counts.most_common(1)[0][0] if type_counts else "N/A"
+        s["priority"] = task_priority_lookup.get(s["task"], 0)
+    # Saved with its type, priority and available hours so the history archive can use them later
+    save_today_schedule(schedule, available_hours)
+    st.success("Today's schedule saved!")
+    # Kept across reruns, so the dashboard below survives interactions that don't regenerate it
+    st.session_state["schedule"] = schedule
+
+schedule = st.session_state.get("schedule")
+if schedule is not None:
+    all_tags = sorted({tag for s in schedule for tag in s.get("tags", [])})
+    selected_tags = st.sidebar.multiselect("Filter by tags", all_tags, default = all_tags)
+
+    # Derived state is recomputed only when one of its inputs changed
+    dashboard_inputs = json.dumps([schedule, tasks, selected_types, selected_tags, available_hours, focus_tag], sort_keys=True, default=str)
+    if st.session_state.get("dashboard_inputs") != dashboard_inputs:
+        st.session_state["dashboard"] = dashboard_state(schedule, tasks, selected_types, selected_tags, available_hours, focus_tag, task_index)
+        st.session_state["dashboard_inputs"] = dashboard_inputs
+    dashboard = st.session_state["dashboard"]
+    filtered_schedule = dashboard["filtered_schedule"]
+
+    if st.session_state.pop("edits_applied", False):
+        st.success("Custom schedule applied!")
 
     if filtered_schedule:
-        st.subheader("Manual Adjustments (Drag to reorder)")
-        
-        for idx, task in enumerate(filtered_schedule):
-            task["order"] = idx
-            
-        edited_schedule = st.data_editor(filtered_schedule, 
-                                         column_order=["order", "start", "end", "task", "energy", "task_type", "tags"],
-                                         use_container_width=True, num_rows="fixed")
-
-        if st.button("Apply Manual Edits and Save"):
-            edited_schedule.sort(key = lambda x: x["order"])
-            save_today_schedule(edited_schedule)
-            st.success("Custom schedule applied!")
-            
-            filtered_schedule = edited_schedule
-        
+        manual_adjustments(filtered_schedule)
+
         st.subheader("Filtered Schedule")
-        
+
         type_icons = {
             "Study": "📚",
             "Work": "💼",
@@ -222,108 +310,81 @@ if st.button("Generate Schedule") and tasks:
             tag_str = ", ".join(s.get("tags", []))
             st.markdown(f"***{s['start']} – {s['end']}** &nbsp;  {s['task']} ({s['energy'].capitalize()} energy){' | ' + tag_str if tag_str else ''}")
 
+        energy_counts = dashboard["energy_counts"]
         st.subheader("Task Summary Dashboard")
         col1, col2, col3 = st.columns(3)
         with col1:
             st.metric("High Energy Tasks", f"{energy_counts.get('high', 0)}")
-        
+
         with col2:
             st.metric("Medium Energy", f"{energy_counts.get('medium', 0)}")
-        
+
         with col3:
             st.metric("Low Energy", f"{energy_counts.get('low', 0)}")
-        st.markdown(f"**Most Frequent Task type**: {most_common_type}")
-        st.markdown(f"**Average Priority**: {avg_priority:.2f}")
-    
+        st.markdown(f"**Most Frequent Task type**: {dashboard['most_common_type']}")
+        st.markdown(f"**Average Priority**: {dashboard['avg_priority']:.2f}")
+
        # -- Pie Chart --
         st.subheader("Time Distribution")
-        labels = [s["task"] for s in filtered_schedule]
-        sizes = [int(s["end"].split(":")[0]) - int(s["start"].split(":")[0]) for s in filtered_schedule]
-        fig, ax = plt.subplots()
-        ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90)
-        ax.axis('equal')
-        st.pyplot(fig)
-        schedule_text = format_schedule_text(filtered_schedule)
-        st.download_button("Download schedule as .txt", schedule_text, file_name="schedule.txt")
+        show_chart(dashboard["pie"])
+        st.download_button("Download schedule as .txt", dashboard["schedule_text"], file_name="schedule.txt")
 
         #Bar Chart
         st.subheader("Hour spent per task type")
-        type_hours = {}
-        for s in filtered_schedule:
-            hrs = int(s["end"].split(":")[0]) - int(s["start"].split(":")[0])
-            type_hours[s["task_type"]] = type_hours.get(s["task_type"], 0) + hrs
-            
-        fig2, ax2 = plt.subplots()
-        ax2.bar(type_hours.keys(), type_hours.values(), color = 'skyblue')
-        ax2.set_ylabel("Hours")
-        ax2.set_xlabel("Task Type")
-        st.pyplot(fig2, use_container_width=True)
-        
+        show_chart(dashboard["type_hours"])
+
         # -- Daily Insights Summary --
         st.subheader("Daily Insights")
-        total_tasks = len(filtered_schedule)
-        total_duration = sum(int(s["end"].split(":")[0]) - int(s["start"].split(":")[0]) for s in filtered_schedule)
-        energy_count = Counter(s["energy"] for s in filtered_schedule)
-        type_duration = {}
-        priority_map = {s['task']: next((t['priority'] for t in tasks if t["name"] == s["task"]), 0) for s in filtered_schedule}
-        max_priority_task = max(priority_map.items(), key = lambda x: x[1])[0] if type_duration else "None"
-        
-        for s in filtered_schedule:
-            hrs = int(s["end"].split(":")[0]) - int(s["start"].split(":")[0])
-            type_duration[s["task_type"]] = type_duration.get(s["task_type"], 0) + hrs
-        
-        max_type = max(type_duration.items(), key=lambda x: x[1])[0] if type_duration else "N/A"
-        completion_percent = round((total_duration/ available_hours) * 100, 1) if available_hours else 0
-        
+        completion_percent = dashboard["completion_percent"]
+
         col1, col2, col3 = st.columns(3)
-        col1.metric("Total Tasks", total_tasks)
-        col2.metric("Total Hours Used", total_duration)
+        col1.metric("Total Tasks", len(filtered_schedule))
+        col2.metric("Total Hours Used", dashboard["total_duration"])
         col3.metric("percent(%) of day utilized", f"{completion_percent}%")
-        
+
         col4, col5, col6 = st.columns(3)
-        col4.metric("Most Time Type", max_type)
-        col5.metric("High Energy Tasks", energy_count.get("high", 0))
-        col6.metric("Top Priority Task", max_priority_task)
-        
+        col4.metric("Most Time Type", dashboard["max_type"])
+        col5.metric("High Energy Tasks", energy_counts.get("high", 0))
+        col6.metric("Top Priority Task", dashboard["max_priority_task"])
+
+        col7, col8, col9 = st.columns(3)
+        col7.metric("Productivity Score", f"{dashboard['productivity_score']:.0f}")
+        predicted = dashboard["predicted_score"]
+        col8.metric("Predicted from History", f"{predicted:.0f}" if predicted is not None else "N/A")
+        week_utilization = dashboard["week_utilization"]
+        col9.metric("Last 7 Days Utilized", f"{week_utilization * 100:.1f}%" if week_utilization is not None else "N/A")
+
         if completion_percent >=90:
             st.success("You are killing it! Almost a fully packed day.")
         elif completion_percent >=60:
             st.info("Solid work! You can try to squeeze in one more task.")
         else:
             st.warning("You still have time! Fill it with something meaningful")
-        
-        unused_time = available_hours - total_duration
-        
+
+        unused_time = dashboard["unused_time"]
+
         if unused_time <= 0:
             st.info("You're fully scheduled. No more suggestions for today.")
         else:
             st.markdown(f"You have **{unused_time} hour(s)** still available")
-            
-            focus_tag_lower = focus_tag.strip().lower()
-            remaining_tasks = [
-                t for t in tasks
-                if t["name"] not in [s["task"] for s in filtered_schedule]
-                and t["duration"] <= unused_time
-                and (focus_tag_lower in [tag.lower() for tag in t.get("tags", [])] if focus_tag_lower else True)
-            ]
-            
-            sorted_suggestions = sorted(remaining_tasks, key=lambda x: (x["priority"], x["energy"] == "low"), reverse=True)
-            
-            if sorted_suggestions:
-                for suggestion in sorted_suggestions[:5]:
-                    tags_string = ", ".join(suggestion.get("tags", []))
-                    st.markdown(f"• **{suggestion['name']}** ({suggestion['duration']} hr, {suggestion['energy']} energy) — _Tags: {tags_string}_")
+
+            if dashboard["suggestions"]:
+                for suggestion in dashboard["suggestions"]:
+                    names = " + ".join(f"**{task['name']}**" for task in suggestion["tasks"])
+                    slots = ", ".join(f"{e['start']}–{e['end']}" for e in suggestion["entries"])
+                    st.markdown(f"• {names} ({suggestion['hours']} hr, total priority {suggestion['priority']}) — _{slots}_")
             else:
                 st.info("No suitable tasks found matching the focus tag or time")
         st.subheader("Task Timeline (Gantt View)")
         plot_task_timeline(filtered_schedule)
-        
+
         # -- Unused Time Info --
-        total_used = sum(sizes)
-        time_left = available_hours - total_used
+        time_left = unused_time
         if time_left>=2:
             st.warning(f"Warning: {time_left} hour(s) left unscheduled.")
         else:
             st.warning(f"Good Job! Only {time_left} hour(s) left unschedule.")
+
+        what_if(tasks)
     else:
         st.warning("Not enough time to fit any task!")
@@ -0,0 +1,33 @@
+import random
+
+TASK_TYPES = ["Study", "Work", "Health", "Personal", "Creative"]
+ENERGIES = ["high", "medium", "low"]
+
+
+# Synthetic task list; every knob the scheduler's cost depends on can be scaled on its own
+def make_tasks(count, tag_count=16, max_duration=4, fractional=False, seed=0):
+    rng = random.Random(seed)
+    tags = [f"tag{i}" for i in range(tag_count)]
+    tasks = []
+    for i in range(count):
+        if fractional:
+            duration = rng.randint(1, int(max_duration * 4)) / 4
+        else:
+            duration = rng.randint(1, max_duration)
+        tasks.append({
+            "name": f"Task {i}",
+            "duration": duration,
+            "priority": rng.randint(1, 5),
+            "type": rng.choice(TASK_TYPES),
+            "energy": rng.choice(ENERGIES),
+            "tags": rng.sample(tags, min(len(tags), rng.randint(0, 3))),
+        })
+    return tasks
+
+
+# Schedule-shaped rows (with task_type) for the schedule filters
+def make_schedule_rows(tasks):
+    return [
+        {"task": t["name"], "energy": t["energy"], "task_type": t["type"], "type": t["type"], "tags": t["tags"]}
+        for t in tasks
+    ]
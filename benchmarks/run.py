@@ -0,0 +1,192 @@
+"""
+Benchmarks for the scheduler, smart suggestions and task filters.
+
+    python -m benchmarks.run                              # full grid, compared to benchmarks/baseline.json
+    python -m benchmarks.run --quick --save-baseline      # record a new baseline
+    python -m benchmarks.run --baseline other.json --threshold 0.25
+    python -m benchmarks.run --no-baseline                # just record results
+
+Each case is timed as the best of several runs, and its peak memory is taken from a separate
+tracemalloc run. A case that is slower (or uses more memory) than the baseline by more than the
+threshold is a regression and the exit status is 1. Timings only compare on the same machine,
+so record the baseline with --save-baseline where the gate runs.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.generators import make_schedule_rows, make_tasks
+from scheduler.cache import ScheduleCache
+from scheduler.core import ENERGY_BLOCKS, compute_score_matrix, compute_task_score, generate_schedule
+from utils.task_utils import filter_by_tags, filter_schedule_by_type, filter_schedule_by_type_and_tags, get_smart_suggestions
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+
+FULL_SIZES = [10, 100, 1000, 10000, 100000]
+QUICK_SIZES = [10, 100, 1000, 10000]
+
+
+def configs(sizes):
+    # Scale the task count at a fixed shape, then vary one other knob at a time
+    base = {"tasks": 1000, "tag_count": 16, "max_duration": 4, "fractional": False, "hours": 8}
+    for count in sizes:
+        yield dict(base, tasks=count)
+    middle = sizes[len(sizes) // 2]
+    for tag_count in (4, 256, 4096):
+        yield dict(base, tasks=middle, tag_count=tag_count)
+    for max_duration, fractional in ((1, False), (12, False), (4, True)):
+        yield dict(base, tasks=middle, max_duration=max_duration, fractional=fractional)
+    for hours in (2, 14):
+        yield dict(base, tasks=middle, hours=hours)
+
+
+def cases(config):
+    tasks = make_tasks(config["tasks"], config["tag_count"], config["max_duration"], config["fractional"])
+    rows = make_schedule_rows(tasks)
+    hours = config["hours"]
+    used = {t["name"] for t in tasks[::3]}
+    selected_tags = [f"tag{i}" for i in range(0, config["tag_count"], 4)]
+
+    # Primed once, so every timed call is a memory hit
+    cache = ScheduleCache()
+    cache.generate_schedule(tasks, hours, "tag1")
+    cache.generate_schedule(tasks, hours, "tag1", fingerprint=1)
+
+    def score_all():
+        for task in tasks:
+            for energy_level in ENERGY_BLOCKS:
+                compute_task_score(task, energy_level, "tag1")
+
+    return {
+        "generate_schedule": lambda: generate_schedule(tasks, hours, "tag1"),
+        "schedule_cache_hit": lambda: cache.generate_schedule(tasks, hours, "tag1"),
+        "schedule_cache_hit_fingerprint": lambda: cache.generate_schedule(tasks, hours, "tag1", fingerprint=1),
+        "compute_task_score": score_all,
+        "compute_score_matrix": lambda: compute_score_matrix(tasks, ENERGY_BLOCKS, "tag1"),
+        "get_smart_suggestions": lambda: get_smart_suggestions(tasks, used, 2, "tag1"),
+        "filter_schedule_by_type": lambda: filter_schedule_by_type(rows, "Study"),
+        "filter_by_tags": lambda: filter_by_tags(rows, selected_tags),
+        "filter_schedule_by_type_and_tags": lambda: filter_schedule_by_type_and_tags(rows, ["Study", "Work"], selected_tags),
+    }
+
+
+def measure(fn, min_time=0.2, max_repeats=7):
+    # Best of several runs; at least two, more while the total stays short
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < 2 or (len(timings) < max_repeats and time.perf_counter() - started < min_time):
+        t = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t)
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": min(timings), "mean_seconds": sum(timings) / len(timings), "repeats": len(timings), "peak_kb": peak / 1024}
+
+
+def case_key(name, config):
+    params = ",".join(f"{k}={v}" for k, v in sorted(config.items()))
+    return f"{name}[{params}]"
+
+
+def run(sizes, only=None):
+    results = []
+    for config in configs(sizes):
+        for name, fn in cases(config).items():
+            if only and name not in only:
+                continue
+            result = {"key": case_key(name, config), "name": name, "params": config}
+            result.update(measure(fn))
+            results.append(result)
+            print(f"{result['key']}: {result['seconds'] * 1000:.3f} ms, peak {result['peak_kb']:.0f} KiB", file=sys.stderr)
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, threshold, memory_threshold):
+    """
+    Regressions of `report` against `baseline`, as a list of readable lines.
+    """
+    previous = {r["key"]: r for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        old = previous.get(result["key"])
+        if not old:
+            continue
+        time_ratio = result["seconds"] / old["seconds"] if old["seconds"] else 1
+        memory_ratio = result["peak_kb"] / old["peak_kb"] if old["peak_kb"] else 1
+        result["time_ratio"] = time_ratio
+        result["memory_ratio"] = memory_ratio
+        if time_ratio > 1 + threshold:
+            regressions.append(f"{result['key']}: {time_ratio:.2f}x slower ({old['seconds'] * 1000:.3f} -> {result['seconds'] * 1000:.3f} ms)")
+        if memory_ratio > 1 + memory_threshold:
+            regressions.append(f"{result['key']}: {memory_ratio:.2f}x more memory ({old['peak_kb']:.0f} -> {result['peak_kb']:.0f} KiB)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scheduler, suggestions and filters.")
+    parser.add_argument("--quick", action="store_true", help="skip the 100k-task sizes")
+    parser.add_argument("--sizes", help="comma-separated task counts, overrides --quick")
+    parser.add_argument("--only", help="comma-separated benchmark names to run")
+    parser.add_argument("--output", help="where to write the results JSON")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON to compare against (default: %(default)s, if it exists)")
+    parser.add_argument("--no-baseline", action="store_true", help="don't compare against any baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, as a fraction")
+    parser.add_argument("--memory-threshold", type=float, default=0.25, help="allowed peak memory growth, as a fraction")
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write the results to {BASELINE_PATH}")
+    args = parser.parse_args(argv)
+
+    if args.sizes:
+        sizes = [int(size) for size in args.sizes.split(",")]
+    else:
+        sizes = QUICK_SIZES if args.quick else FULL_SIZES
+    only = set(args.only.split(",")) if args.only else None
+
+    report = run(sizes, only)
+
+    regressions = []
+    # An explicit --baseline must exist; the default one is optional
+    baseline = None if args.no_baseline else args.baseline
+    if baseline == BASELINE_PATH and not os.path.exists(baseline):
+        baseline = None
+    if baseline:
+        with open(baseline, "r") as f:
+            regressions = compare(report, json.load(f), args.threshold, args.memory_threshold)
+        report["regressions"] = regressions
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {BASELINE_PATH}", file=sys.stderr)
+
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from scheduler.core import generate_schedule
+
+CACHE_DIR = os.path.join("data", "schedule_cache")
+
+
+def _task_fields(task):
+    return (task["name"], task["duration"], task["priority"], task["energy"], task.get("type"), tuple(task.get("tags", ())))
+
+
+def schedule_key(tasks, available_hours, focus_tag="", resolution=1, fingerprint=None):
+    """
+    Hashable key for generate_schedule's inputs, as a tuple of the fields each task is scheduled by.
+
+    Task order is kept because it decides ties. The focus tag is lowercased because scoring
+    ignores its case. Callers that track their own task version can pass it as `fingerprint`
+    (any hashable that changes whenever the tasks do) to skip reading the tasks at all.
+    """
+    if fingerprint is None:
+        fingerprint = tuple(_task_fields(task) for task in tasks)
+    return (fingerprint, available_hours, (focus_tag or "").lower(), resolution)
+
+
+def disk_key(key):
+    # Stable across processes, unlike hash(); only needed on a memory miss
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+class ScheduleCache:
+    """
+    Memoizes generate_schedule in a bounded in-memory LRU, optionally backed by JSON files.
+
+    Pass `cache_dir` (e.g. CACHE_DIR) to keep schedules across processes; disk entries are
+    written atomically and promoted to memory on a hit.
+    """
+
+    def __init__(self, max_entries=256, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        # Shared by every Streamlit session thread; generating a schedule happens outside it
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def generate_schedule(self, tasks, available_hours, focus_tag="", resolution=1, fingerprint=None):
+        key = schedule_key(tasks, available_hours, focus_tag, resolution, fingerprint)
+
+        with self._lock:
+            schedule = self._entries.get(key)
+            if schedule is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if schedule is None:
+            schedule = self._load(key)
+            disk_hit = schedule is not None
+            if not disk_hit:
+                schedule = generate_schedule(tasks, available_hours, focus_tag, resolution)
+                self._store(key, schedule)
+            with self._lock:
+                if disk_hit:
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+                self._remember(key, schedule)
+
+        # Copies, so callers can annotate entries without corrupting the cache
+        return [dict(entry) for entry in schedule]
+
+    def _remember(self, key, schedule):
+        # Caller holds the lock
+        self._entries[key] = [dict(entry) for entry in schedule]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{disk_key(key)}.json")
+
+    def _load(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key, schedule):
+        if not self.cache_dir:
+            return
+        # A fresh temp file per call, so no two threads or processes ever write the same one
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(schedule, f, separators=(",", ":"))
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+
+_default_cache = ScheduleCache()
+
+
+def cached_generate_schedule(tasks, available_hours, focus_tag="", resolution=1, fingerprint=None):
+    return _default_cache.generate_schedule(tasks, available_hours, focus_tag, resolution, fingerprint)
+
+
+def cache_stats():
+    return _default_cache.stats()
@@ -0,0 +1,165 @@
+"""
+Streams tasks or per-user profiles in as JSONL and writes schedules out as JSONL.
+
+    python -m scheduler.cli tasks.jsonl --hours 6 --focus-tag ml
+    cat profiles.jsonl | python -m scheduler.cli --profiles --workers 4 -o schedules.jsonl
+
+Task mode: every line is a task. Only the best candidates per energy block and length in minutes
+are kept, so memory stays flat however long the input is. Each schedule entry is one output line.
+
+Profile mode: every line is {"id", "tasks", "available_hours", "focus_tag"}. Each profile becomes
+one output line, {"id", "schedule"} or {"id", "error"}, written as soon as it is scheduled.
+"""
+import argparse
+import contextlib
+import heapq
+import json
+import sys
+
+from scheduler.core import DAY_END, DAY_START, ENERGY_BLOCKS, compute_task_score, generate_schedule, schedule_many
+from scheduler.timeline import MINUTES_PER_HOUR, to_minutes
+from utils.task_utils import normalize_task
+
+
+def read_jsonl(lines, errors):
+    # Yields (line number, parsed object); malformed lines are reported and skipped
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as e:
+            errors.write(f"line {number}: invalid JSON ({e})\n")
+
+
+def candidate_pool(tasks, available_hours, focus_tag="", resolution=1):
+    """
+    Keeps only the tasks generate_schedule could ever pick, in their original order.
+
+    Tasks longer than `available_hours` or the whole day never fit and are dropped. A day has
+    room for only so many tasks of a given length in minutes: one per slot, and no more than the
+    day and the hours budget hold. A task that is not among that many top scores of its length
+    in some energy block can never be the best choice there. Pools are keyed by minutes, so
+    memory is bounded by the day whatever the input length. Exact as long as task names are
+    unique and tasks of the same length in minutes have the same duration.
+    """
+    slots = (DAY_END - DAY_START) // resolution + 1
+
+    def limit(minutes):
+        if not minutes:
+            return slots
+        # A task of `minutes` lasts at least minutes - 0.5 before rounding
+        budget = int(available_hours * MINUTES_PER_HOUR / (minutes - 0.5))
+        return min(slots, (DAY_END - DAY_START) // minutes, budget)
+
+    pools = {}
+    for position, task in enumerate(tasks):
+        minutes = to_minutes(task["duration"])
+        if task["duration"] > available_hours or minutes > DAY_END - DAY_START:
+            continue
+        for energy_level in ENERGY_BLOCKS:
+            key = (energy_level, minutes)
+            if key not in pools:
+                pools[key] = (limit(minutes), [])
+            size, pool = pools[key]
+            # Min-heap on (score, -position): the root is the weakest kept candidate
+            # Positions are unique, so the task dicts themselves are never compared
+            item = (compute_task_score(task, energy_level, focus_tag), -position, task)
+            if len(pool) < size:
+                heapq.heappush(pool, item)
+            elif item[:2] > pool[0][:2]:
+                heapq.heapreplace(pool, item)
+
+    kept = {}
+    for _, pool in pools.values():
+        for _, negative_position, task in pool:
+            kept[-negative_position] = task
+    return [kept[position] for position in sorted(kept)]
+
+
+def run_tasks(lines, out, errors, available_hours, focus_tag, resolution):
+    def tasks():
+        for number, raw in read_jsonl(lines, errors):
+            try:
+                yield normalize_task(raw)
+            except ValueError as e:
+                errors.write(f"line {number}: {e}\n")
+
+    candidates = candidate_pool(tasks(), available_hours, focus_tag, resolution)
+    for entry in generate_schedule(candidates, available_hours, focus_tag, resolution):
+        out.write(json.dumps(entry) + "\n")
+
+
+def _profiles(lines, errors, default_hours, default_focus_tag):
+    for number, raw in read_jsonl(lines, errors):
+        profile = raw if isinstance(raw, dict) else {}
+        profile_id = profile.get("id", number)
+        try:
+            if "tasks" not in profile:
+                raise ValueError("profile has no tasks")
+            yield {
+                "id": profile_id,
+                "tasks": [normalize_task(task) for task in profile["tasks"]],
+                "available_hours": profile.get("available_hours", default_hours),
+                "focus_tag": profile.get("focus_tag", default_focus_tag),
+            }
+        except ValueError as e:
+            yield {"id": profile_id, "error": str(e)}
+
+
+def run_profiles(lines, out, errors, available_hours, focus_tag, resolution, workers):
+    def write(profile_id, schedule, error):
+        record = {"id": profile_id, "error": error} if error else {"id": profile_id, "schedule": schedule}
+        out.write(json.dumps(record) + "\n")
+
+    profiles = _profiles(lines, errors, available_hours, focus_tag)
+
+    if workers:
+        # Invalid profiles are answered here; the rest go to the pool in input order
+        def valid():
+            for profile in profiles:
+                if "error" in profile:
+                    write(profile["id"], None, profile["error"])
+                else:
+                    yield profile
+
+        for result in schedule_many(valid(), max_workers=workers, resolution=resolution):
+            write(result["id"], result["schedule"], result["error"])
+        return
+
+    for profile in profiles:
+        if "error" in profile:
+            write(profile["id"], None, profile["error"])
+            continue
+        try:
+            schedule = generate_schedule(profile["tasks"], profile["available_hours"], profile["focus_tag"], resolution)
+        except Exception as e:
+            write(profile["id"], None, f"{type(e).__name__}: {e}")
+            continue
+        write(profile["id"], schedule, None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Schedule tasks or profiles from a JSONL stream.")
+    parser.add_argument("input", nargs="?", default="-", help="JSONL file to read, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL file to write, or - for stdout")
+    parser.add_argument("--profiles", action="store_true", help="read one profile per line instead of one task per line")
+    parser.add_argument("--hours", type=float, default=6, help="available hours (default for profiles without one)")
+    parser.add_argument("--focus-tag", default="", help="focus tag (default for profiles without one)")
+    parser.add_argument("--resolution", type=int, default=1, help="slot size in minutes")
+    parser.add_argument("--workers", type=int, default=0, help="schedule profiles on this many processes")
+    args = parser.parse_args(argv)
+
+    with contextlib.ExitStack() as stack:
+        lines = sys.stdin if args.input == "-" else stack.enter_context(open(args.input, "r"))
+        out = sys.stdout if args.output == "-" else stack.enter_context(open(args.output, "w"))
+
+        if args.profiles:
+            run_profiles(lines, out, sys.stderr, args.hours, args.focus_tag, args.resolution, args.workers)
+        else:
+            run_tasks(lines, out, sys.stderr, args.hours, args.focus_tag, args.resolution)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,49 @@
+import collections
+import heapq
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from scheduler.tasks import TaskTable, task_columns, to_jsonable
+from scheduler.timeline import MINUTES_PER_HOUR, Timeline, entry_minutes, format_minutes, to_minutes
+from scheduler.tracing import active_tracer
+
+logger = logging.getLogger(__name__)
+
+# Energy match weight, keyed by (task energy, block energy)
+ENERGY_WEIGHTS = {
+    ("high", "high"): 15,
+    ("medium", "medium"): 10,
+    ("low", "low"): 10,
+    ("high", "medium"): 5,
+    ("medium", "low"): 2,
+}
+
+# Hours of the day covered by each energy block
+ENERGY_BLOCKS = {
+    "high": range(8, 12),     # 8AM - 12PM
+    "medium": range(12, 16),  # 12PM - 4PM
+    "low": range(16, 22)      # 4PM - 10PM
+}
+
+# Working window in minutes since midnight
+DAY_START = min(hours.start for hours in ENERGY_BLOCKS.values()) * MINUTES_PER_HOUR
+DAY_END = max(hours.stop for hours in ENERGY_BLOCKS.values()) * MINUTES_PER_HOUR
+
+
+def energy_at(minute):
+    for energy_level, hours in ENERGY_BLOCKS.items():
+        if hours.start * MINUTES_PER_HOUR <= minute < hours.stop * MINUTES_PER_HOUR:
+            return energy_level
+    return None
+
+
 def compute_task_score(task, block_energy, focus_tag):
     score = 0
 
@@ -5,14 +51,7 @@ def compute_task_score(task, block_energy, focus_tag):
     score += task["priority"] * 10
 
     # Energy match weight
-    energy_weights = {
-        ("high", "high"): 15,
-        ("medium", "medium"): 10,
-        ("low", "low"): 10,
-        ("high", "medium"): 5,
-        ("medium", "low"): 2,
-    }
-    score += energy_weights.get((task["energy"], block_energy), 0)
+    score += ENERGY_WEIGHTS.get((task["energy"], block_energy), 0)
 
     # Focus tag weight
     if focus_tag:
@@ -23,73 +62,499 @@ def compute_task_score(task, block_energy, focus_tag):
     return score
 
 
-def generate_schedule(tasks, available_hours, focus_tag=""):
-    energy_blocks = {
-        "high": range(8, 12),     # 8AM - 12PM
-        "medium": range(12, 16),  # 12PM - 4PM
-        "low": range(16, 22)      # 4PM - 10PM
+def compute_score_matrix(tasks, block_energies, focus_tag=""):
+    """
+    Scores every task against every energy block in one pass.
+
+    Gives exactly the same values as compute_task_score(task, block, focus_tag).
+
+    Returns:
+    - NumPy array of shape (len(tasks), len(block_energies)).
+    """
+    block_energies = list(block_energies)
+
+    if isinstance(tasks, TaskTable):
+        # Columns are already there, energies already coded
+        priorities = tasks.priority
+        codes = tasks.energy_code
+        energies = tasks.energies.values
+    else:
+        priorities = np.array([task["priority"] for task in tasks])
+        energy_codes = {}
+        codes = np.array([energy_codes.setdefault(task["energy"], len(energy_codes)) for task in tasks], dtype=np.intp)
+        energies = list(energy_codes)
+
+    # One weight row per distinct task energy, then gather a row for each task
+    weight_table = np.array(
+        [[ENERGY_WEIGHTS.get((energy, block), 0) for block in block_energies] for energy in energies],
+        dtype=np.int64,
+    ).reshape(len(energies), len(block_energies))
+
+    scores = priorities.reshape(-1, 1) * 10 + weight_table[codes]
+
+    # Focus tag weight
+    if focus_tag:
+        scores = scores + _focus_mask(tasks, focus_tag).reshape(-1, 1) * 10
+
+    return scores
+
+
+def _focus_mask(tasks, focus_tag):
+    # Boolean array: which tasks carry `focus_tag`, ignoring case
+    if isinstance(tasks, TaskTable):
+        return tasks.has_tag(focus_tag)
+    focus = focus_tag.lower()
+    return np.array([focus in [tag.lower() for tag in task.get("tags", [])] for task in tasks], dtype=bool)
+
+
+def _schedule_entry(task, start, end):
+    return {
+        "task": task["name"],
+        "start": format_minutes(start),
+        "end": format_minutes(end),
+        "start_minute": start,
+        "end_minute": end,
+        "energy": task["energy"],
+        "tags": ", ".join(task.get("tags", []))
     }
 
+
+def _build_candidate_index(durations, scores):
+    # Per-duration heaps of (-score, position), so ties still go to the earliest task in the list
+    index = {}
+    for position, (duration, score) in enumerate(zip(durations, scores)):
+        index.setdefault(duration, []).append((-score, position))
+    for heap in index.values():
+        heapq.heapify(heap)
+    return index
+
+
+def _best_candidate(index, durations, names, scheduled_tasks, minute, used_hours, available_hours, tracer=None):
+    best = None
+    for i, duration in enumerate(durations):
+        # Durations are sorted, so the first one that does not fit rules out the rest
+        if used_hours + duration > available_hours or minute + to_minutes(duration) > DAY_END:
+            if tracer:
+                reason = "over_budget" if used_hours + duration > available_hours else "past_cutoff"
+                tracer.count(f"rejected.{reason}", sum(len(index[d]) for d in durations[i:]))
+            break
+
+        # Lazy deletion: drop heap tops whose task name has been scheduled since the index was built
+        heap = index[duration]
+        while heap and names[heap[0][1]] in scheduled_tasks:
+            heapq.heappop(heap)
+            if tracer:
+                tracer.count("rejected.scheduled")
+
+        if heap:
+            if tracer:
+                tracer.count("candidates.evaluated")
+            if best is None or heap[0] < best:
+                best = heap[0]
+    return best
+
+
+def _block_candidates(tasks, focus_tag="", tracer=None, score_matrix=None):
+    """
+    Scores `tasks` once (unless given their `score_matrix`) and builds each energy block's candidate index.
+
+    Returns (names, candidates), where candidates maps each energy block to its per-duration
+    heaps and their sorted durations. The heaps only lose entries of scheduled tasks, so the same
+    candidates can go on to fill any number of days.
+    """
+    clock = time.perf_counter
+
+    # Score all tasks against all energy blocks up front instead of once per (hour, task)
+    started = clock() if tracer else 0
+    if score_matrix is None:
+        score_matrix = compute_score_matrix(tasks, ENERGY_BLOCKS, focus_tag)
+    names, task_durations = task_columns(tasks)
+    if tracer:
+        tracer.add_time("scoring", clock() - started)
+        tracer.count("tasks", len(names))
+
+    started = clock() if tracer else 0
+    candidates = {}
+    for col, energy_level in enumerate(ENERGY_BLOCKS):
+        index = _build_candidate_index(task_durations, score_matrix[:, col].tolist())
+        candidates[energy_level] = (index, sorted(index))
+    if tracer:
+        tracer.add_time("indexing", clock() - started)
+    return names, candidates
+
+
+def _fill_day(tasks, names, candidates, scheduled_tasks, available_hours, resolution=1, tracer=None, picked=None):
+    # One day of the greedy: adds every task it places to `scheduled_tasks`, and (position, block) to `picked` if given
+    clock = time.perf_counter
+
     schedule = []
     used_hours = 0
-    scheduled_tasks = set()
-    occupied_hours = set()  # ❗ Tracks all hours already scheduled
+    timeline = Timeline(DAY_START, DAY_END, resolution)  # ❗ Tracks all minutes already scheduled
+
+    minute = timeline.start
+    for energy_level, hours in ENERGY_BLOCKS.items():
+        index, durations = candidates[energy_level]
+        block_end = hours.stop * MINUTES_PER_HOUR
 
-    for energy_level, hours in energy_blocks.items():
-        for hour in hours:
+        # Jump straight to free slots instead of visiting every slot of the block
+        minute = timeline.next_free(max(minute, hours.start * MINUTES_PER_HOUR))
+        while minute < block_end:
             if used_hours >= available_hours:
                 break
 
-            # Skip if current hour is already occupied
-            if hour in occupied_hours:
-                continue
-
             best_task = None
             best_score = -1
 
-            for task in tasks:
-                duration = task["duration"]
-                task_hours = range(hour, hour + duration)
-
-                # Skip if:
-                # - Already scheduled
-                # - Not enough time left
-                # - Will exceed working window (i.e., 22)
-                # - Any of the task's hours are occupied
-                if (
-                    task["name"] in scheduled_tasks or
-                    used_hours + duration > available_hours or
-                    hour + duration > 22 or
-                    any(h in occupied_hours for h in task_hours)
-                ):
-                    continue
+            # Slots are filled in order, so once `minute` is free every later slot is free too
+            # and only the name, the remaining budget and the 22:00 cutoff can rule a task out
+            started = clock() if tracer else 0
+            best = _best_candidate(index, durations, names, scheduled_tasks, minute, used_hours, available_hours, tracer)
+            if best is not None and -best[0] > best_score:
+                best_score = -best[0]
+                best_task = tasks[best[1]]
+            if tracer:
+                tracer.add_time("feasibility", clock() - started)
+                if best is not None and not best_task:
+                    tracer.count("rejected.low_score")
+
+            # Scores are fixed within a block and later slots only get tighter,
+            # so if nothing fits now nothing will until the next block
+            if not best_task:
+                if tracer:
+                    tracer.count("slots.skipped", -(-(block_end - minute) // resolution))
+                break
+
+            started = clock() if tracer else 0
+            duration = best_task["duration"]
+            start = minute
+            end = minute + to_minutes(duration)
 
-                score = compute_task_score(task, energy_level, focus_tag)
-                if score > best_score:
-                    best_score = score
-                    best_task = task
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Assigning task: '%s' | Duration: %sh | Energy: %s | Slot: %s to %s",
+                    best_task["name"], duration, best_task["energy"], format_minutes(start), format_minutes(end),
+                )
 
-            if best_task:
-                duration = best_task["duration"]
-                start = hour
-                end = hour + duration
+            schedule.append(_schedule_entry(best_task, start, end))
+            if picked is not None:
+                picked.append((best[1], energy_level))
 
-                print(f"[DEBUG] Assigning task: '{best_task['name']}' | Duration: {duration}h | Energy: {best_task['energy']} | Slot: {start}:00 to {end}:00")
+            used_hours += duration
+            scheduled_tasks.add(best_task["name"])
+            timeline.occupy(start, end)  # ❗ Mark these minutes as used
 
-                schedule.append({
-                    "task": best_task["name"],
-                    "start": f"{start}:00",
-                    "end": f"{end}:00",
-                    "energy": best_task["energy"],
-                    "tags": ", ".join(best_task.get("tags", []))
-                })
+            # At most one task per slot, even for zero-length tasks
+            minute = timeline.next_free(max(end, start + resolution))
 
-                used_hours += duration
-                scheduled_tasks.add(best_task["name"])
-                occupied_hours.update(range(start, end))  # ❗ Mark these hours as used
+            if tracer:
+                tracer.add_time("assignment", clock() - started)
+                tracer.count("slots.filled")
+                tracer.emit("assign", task=best_task["name"], start=start, end=end, energy=energy_level, score=best_score)
 
     return schedule
 
+
+def generate_schedule(tasks, available_hours, focus_tag="", resolution=1, tracer=None):
+    """
+    Greedily fills the day from 8:00, giving each free slot the best scoring task that still fits.
+
+    Durations are in hours and may be fractional. Tasks start on multiples of `resolution`
+    minutes, and each entry carries numeric "start_minute"/"end_minute" fields alongside the
+    "H:MM" strings. Pass a Tracer (or install one with scheduler.tracing) to collect phase
+    timings, counters and "assign" events.
+    """
+    tracer = tracer if tracer is not None else active_tracer()
+    profiler = tracer.start_call() if tracer else None
+
+    try:
+        names, candidates = _block_candidates(tasks, focus_tag, tracer)
+        return _fill_day(tasks, names, candidates, set(), available_hours, resolution, tracer)
+    finally:
+        # Even when a task is malformed, so a sampled call never leaves cProfile running
+        if tracer:
+            tracer.finish_call(profiler)
+
+
+def schedule_score(schedule, tasks, focus_tag=""):
+    """
+    Total compute_task_score of a schedule, scoring each entry in the energy block it starts in.
+
+    Entries are matched back to tasks by name and duration; when several tasks share both,
+    the best scoring one is used, which is the one generate_schedule would have picked.
+    """
+    total = 0
+    for s in schedule:
+        start, end = entry_minutes(s)
+        energy = energy_at(start)
+        total += max(
+            (compute_task_score(t, energy, focus_tag) for t in tasks if t["name"] == s["task"] and to_minutes(t["duration"]) == end - start),
+            default=0,
+        )
+    return total
+
+
+def optimize_schedule(tasks, available_hours, focus_tag="", time_budget=1.0, resolution=MINUTES_PER_HOUR):
+    """
+    Anytime branch-and-bound search for the schedule with the highest total compute_task_score.
+
+    Same rules as generate_schedule: each task name is used at most once, tasks start on multiples
+    of `resolution` minutes and are scored by the energy block they start in, nothing runs past
+    22:00 and the total duration stays within available_hours. The greedy schedule is the starting
+    incumbent and is always computed; past it, setup and search stop once time_budget seconds are
+    up, returning the best schedule found so far.
+    A coarse resolution keeps the search tree small, so it defaults to whole hours.
+
+    Returns:
+    - Dict with the "schedule", its "score", the "greedy_score", the "greedy_gap" (score minus
+      greedy_score), an "upper_bound" on the optimum and whether the result is "proven_optimal".
+    """
+    deadline = time.perf_counter() + time_budget
+    levels = list(ENERGY_BLOCKS)
+    grid = Timeline(DAY_START, DAY_END, resolution)
+    day_hours = min(available_hours, (DAY_END - DAY_START) / MINUTES_PER_HOUR)
+
+    # The greedy incumbent, scored straight from the score matrix it was built from
+    score_matrix = compute_score_matrix(tasks, levels, focus_tag)
+    names, candidates = _block_candidates(tasks, score_matrix=score_matrix)
+    picked = []
+    greedy = _fill_day(tasks, names, candidates, set(), available_hours, resolution, picked=picked)
+    greedy_score = sum(int(score_matrix[i, levels.index(level)]) for i, level in picked)
+
+    durations = np.array(task_columns(tasks)[1], dtype=float)
+
+    def result(schedule, score, bound, proven_optimal):
+        return {
+            "schedule": schedule,
+            "score": score,
+            "greedy_score": greedy_score,
+            "greedy_gap": score - greedy_score,
+            "upper_bound": bound,
+            "proven_optimal": proven_optimal,
+        }
+
+    def out_of_time():
+        # Setup ran out of budget: keep the greedy schedule, bounded by the best score per hour
+        best = score_matrix.max(axis=1, initial=0) if len(durations) else np.zeros(0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates = np.where(durations > 0, best / np.where(durations > 0, durations, 1), np.where(best > 0, np.inf, 0))
+        bound = float(rates.max(initial=0) * day_hours) if (best > 0).any() else 0
+        return result(greedy, greedy_score, max(greedy_score, bound), False)
+
+    if time.perf_counter() > deadline:
+        return out_of_time()
+
+    block_scores = [score_matrix[:, col].tolist() for col in range(len(levels))]
+    duration_minutes = [to_minutes(duration) for duration in durations.tolist()]
+    usable = np.flatnonzero(durations >= 0)
+    durations = durations.tolist()
+
+    # Branching order per block: highest score first, ties in task order
+    branch_order = []
+    for col in range(len(levels)):
+        branch_order.append(usable[np.argsort(-score_matrix[usable, col], kind="stable")].tolist())
+        if time.perf_counter() > deadline:
+            return out_of_time()
+
+    # Bound per block: each task at its best score over this and later blocks, by score per hour
+    bound_order = []
+    for col in range(len(levels)):
+        best = score_matrix[usable, col:].max(axis=1) if len(usable) else np.zeros(0)
+        keep = best > 0
+        ids, best = usable[keep], best[keep]
+        spans = np.array([durations[i] for i in ids.tolist()], dtype=float)
+        with np.errstate(divide="ignore"):
+            ratios = np.where(spans > 0, best / np.where(spans > 0, spans, 1), np.inf)
+        # Same order as sorting (ratio, best, duration, i) tuples in reverse
+        order = np.lexsort((ids, spans, best, ratios))[::-1]
+        bound_order.append(list(zip(
+            ratios[order].tolist(), best[order].tolist(), [durations[i] for i in ids[order].tolist()], ids[order].tolist()
+        )))
+        if time.perf_counter() > deadline:
+            return out_of_time()
+
+    def upper_bound(col, capacity, used_names):
+        # Fractional knapsack over the tasks that are still unused
+        total = 0
+        for _, best, duration, i in bound_order[col]:
+            if names[i] in used_names:
+                continue
+            if duration <= capacity:
+                total += best
+                capacity -= duration
+            else:
+                total += best * capacity / duration
+                break
+        return total
+
+    best_score = greedy_score
+    best_choice = None
+    chosen = []
+    used_names = set()
+    timed_out = False
+
+    def search(minute, used_hours, score):
+        nonlocal best_score, best_choice, timed_out
+        if score > best_score:
+            best_score = score
+            best_choice = list(chosen)
+        if minute >= DAY_END or used_hours >= available_hours:
+            return
+        if time.perf_counter() > deadline:
+            timed_out = True
+            return
+
+        col = levels.index(energy_at(minute))
+        capacity = min(available_hours - used_hours, (DAY_END - minute) / MINUTES_PER_HOUR)
+        remaining = upper_bound(col, capacity, used_names)
+        if score + remaining <= best_score:
+            return
+
+        for i in branch_order[col]:
+            task_score = block_scores[col][i]
+            # Sorted by score, so no later task can beat the incumbent either
+            if score + task_score + remaining <= best_score:
+                break
+            end = minute + duration_minutes[i]
+            if names[i] in used_names or used_hours + durations[i] > available_hours or end > DAY_END:
+                continue
+
+            chosen.append((i, minute))
+            used_names.add(names[i])
+            search(grid.align(max(end, minute + resolution)), used_hours + durations[i], score + task_score)
+            used_names.discard(names[i])
+            chosen.pop()
+            if timed_out:
+                return
+
+        # Leave this slot free
+        search(minute + resolution, used_hours, score)
+
+    search(DAY_START, 0, 0)
+
+    if best_choice is None:
+        schedule = greedy
+    else:
+        schedule = [
+            _schedule_entry(tasks[i], start, start + duration_minutes[i])
+            for i, start in sorted(best_choice, key=lambda c: c[1])
+        ]
+
+    if timed_out:
+        bound = max(best_score, upper_bound(0, day_hours, set()))
+    else:
+        bound = best_score
+
+    return result(schedule, best_score, bound, not timed_out)
+
+
+def _encode(obj):
+    return json.dumps(obj, separators=(",", ":"), default=to_jsonable).encode()
+
+
+def _schedule_chunk(chunk, resolution):
+    # Runs in a worker process: chunk is a list of (index, encoded profile)
+    results = []
+    for index, payload in chunk:
+        try:
+            profile = json.loads(payload)
+            schedule = generate_schedule(
+                profile["tasks"], profile["available_hours"], profile.get("focus_tag", ""), resolution
+            )
+            results.append((index, schedule, None))
+        except Exception as e:
+            results.append((index, None, f"{type(e).__name__}: {e}"))
+    return _encode(results)
+
+
+def schedule_many(profiles, max_workers=None, chunk_size=64, resolution=1):
+    """
+    Schedules many task profiles across a process pool, yielding results as they finish.
+
+    Each profile is a dict with "tasks", "available_hours" and an optional "focus_tag" and "id".
+    Profiles are sent to the workers as compact JSON in chunks of `chunk_size`, and at most two
+    chunks per worker are in flight, so `profiles` can be a lazy iterable of any length.
+
+    Yields:
+    - Dicts with the profile's "index" in the input, its "id", and either its "schedule" or an
+      "error" message. A failing profile never affects the others, even one that kills its
+      worker process. Order follows completion.
+    """
+    ids = {}
+
+    def result(index, schedule, error):
+        return {"index": index, "id": ids.pop(index, None), "schedule": schedule, "error": error}
+
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = max_workers * 2
+    profiles = enumerate(profiles)
+    pending = {}
+    exhausted = False
+    # Chunks that were in flight when a worker died; each reruns alone on a fresh pool, so the
+    # profile that kills its worker is narrowed down to one and the rest still get scheduled
+    suspects = collections.deque()
+    pool = ProcessPoolExecutor(max_workers=max_workers)
+
+    def submit(chunk, alone):
+        try:
+            pending[pool.submit(_schedule_chunk, chunk, resolution)] = (chunk, alone, pool)
+        except BrokenProcessPool:
+            suspects.append(chunk)
+
+    try:
+        while pending or suspects or not exhausted:
+            if suspects:
+                if not pending:
+                    submit(suspects.popleft(), True)
+            else:
+                # Keep the pool busy without reading the whole input up front
+                while not exhausted and len(pending) < max_pending and not suspects:
+                    chunk = []
+                    taken = 0
+                    for index, profile in itertools.islice(profiles, chunk_size):
+                        taken += 1
+                        try:
+                            ids[index] = profile.get("id")
+                            chunk.append((index, _encode(profile)))
+                        except Exception as e:
+                            yield result(index, None, f"{type(e).__name__}: {e}")
+                    if taken < chunk_size:
+                        exhausted = True
+                    if chunk:
+                        submit(chunk, False)
+
+            if not pending:
+                if suspects:
+                    # Submitting found the pool already broken
+                    pool.shutdown()
+                    pool = ProcessPoolExecutor(max_workers=max_workers)
+                continue
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk, alone, future_pool = pending.pop(future)
+                try:
+                    chunk_results = json.loads(future.result())
+                except BrokenProcessPool as e:
+                    if future_pool is pool:
+                        pool.shutdown()
+                        pool = ProcessPoolExecutor(max_workers=max_workers)
+                    if not alone:
+                        suspects.append(chunk)
+                    elif len(chunk) > 1:
+                        suspects.extend([item] for item in chunk)
+                    else:
+                        yield result(chunk[0][0], None, f"{type(e).__name__}: {e}")
+                    continue
+                except Exception as e:
+                    # The whole chunk failed to run; report it per profile
+                    for index, _ in chunk:
+                        yield result(index, None, f"{type(e).__name__}: {e}")
+                    continue
+                for index, schedule, error in chunk_results:
+                    yield result(index, schedule, error)
+    finally:
+        pool.shutdown()
+
+
 def assign_energy_blocks(available_hours):
     if available_hours<=3:
         return [(0, available_hours, 'high')]
@@ -0,0 +1,143 @@
+import heapq
+from math import gcd
+
+from scheduler.core import DAY_END, DAY_START, _schedule_entry
+from scheduler.timeline import MINUTES_PER_HOUR, Timeline, entry_minutes, to_minutes
+
+# Most knapsack units the free time is split into; quarter hours over a whole day fit exactly
+MAX_UNITS = 96
+
+
+def free_intervals(schedule, resolution=1):
+    # (start, end) minutes of the day left free by `schedule`
+    timeline = Timeline(DAY_START, DAY_END, resolution)
+    for entry in schedule:
+        timeline.occupy(*entry_minutes(entry))
+    return timeline.free_gaps()
+
+
+def _pack(durations, gaps, resolution):
+    """
+    Places tasks longest first, each at the start of the first gap it still fits in.
+
+    Returns the start minute for each duration (in the order given), or None if some task
+    doesn't fit. First fit decreasing can miss a packing across several gaps, never a wrong one.
+    """
+    gaps = [[start, end] for start, end in gaps]
+    starts = [None] * len(durations)
+    for i in sorted(range(len(durations)), key=lambda i: -durations[i]):
+        for gap in gaps:
+            start = gap[0] + (-(gap[0] - DAY_START) % resolution)
+            if start + durations[i] <= gap[1]:
+                starts[i] = start
+                gap[0] = start + durations[i]
+                break
+        else:
+            return None
+    return starts
+
+
+def fill_gaps(tasks, schedule, available_hours, focus_tag="", k=5, resolution=1):
+    """
+    The top `k` combinations of unscheduled tasks that fit in the time `schedule` leaves free.
+
+    A combination fits if its total duration stays within the unused part of `available_hours`
+    and its tasks can be placed in the day's actual free intervals. Combinations are ranked by
+    total priority, then by time filled. Candidates are filtered like get_smart_suggestions:
+    not already scheduled, and tagged with `focus_tag` when one is given.
+
+    This is a 0/1 knapsack over durations in units of their greatest common divisor, keeping
+    the k best distinct combinations per total duration. Runtime is O(n * W * k) for W units
+    of free time, and only the few best tasks of each duration are fed to it, so large backlogs
+    cost little more than a sort.
+
+    The unit is at least `resolution` and at least 1/MAX_UNITS of the free time, so W stays
+    small even for minute-level durations. Durations that aren't a whole number of units are
+    rounded up for the budget, which can drop combinations that would just fit but never
+    returns one that overruns. Exact whenever the durations' common divisor is that large
+    already, e.g. for quarter-hour durations.
+
+    Returns:
+    - Dicts with "tasks", "entries" (schedule entries placing them in the free intervals),
+      "priority" (their total) and "hours" (their total duration), best first.
+    """
+    gaps = free_intervals(schedule, resolution)
+    used_minutes = sum(end - start for start, end in (entry_minutes(entry) for entry in schedule))
+    budget = min(to_minutes(available_hours) - used_minutes, sum(end - start for start, end in gaps))
+    longest_gap = max((end - start for start, end in gaps), default=0)
+    if budget <= 0 or k <= 0:
+        return []
+
+    scheduled = {entry["task"] for entry in schedule}
+    focus_tag_lower = focus_tag.strip().lower()
+    by_duration = {}
+    seen = set(scheduled)
+    for position, task in enumerate(tasks):
+        if task["name"] in seen:
+            continue
+        seen.add(task["name"])
+        if focus_tag_lower and focus_tag_lower not in [tag.lower() for tag in task.get("tags", [])]:
+            continue
+        minutes = to_minutes(task["duration"])
+        if 0 < minutes <= min(budget, longest_gap):
+            by_duration.setdefault(minutes, []).append((-task["priority"], position, task))
+    if not by_duration:
+        return []
+
+    unit = 0
+    for minutes in by_duration:
+        unit = gcd(unit, minutes)
+    unit = max(unit, resolution, -(-budget // MAX_UNITS))
+    capacity = budget // unit
+
+    # A combination holds at most capacity // w tasks of weight w, and swapping one of them for a
+    # better unused task of the same weight gives another combination at least as good, so only
+    # the best capacity // w + k of each weight can appear in the top k
+    by_weight = {}
+    for minutes, group in by_duration.items():
+        by_weight.setdefault(-(-minutes // unit), []).extend((rank, position, minutes, task) for rank, position, task in group)
+    candidates = []
+    for weight, group in by_weight.items():
+        if weight <= capacity:
+            candidates += [(minutes, weight, task) for _, _, minutes, task in heapq.nsmallest(capacity // weight + k, group)]
+    if not candidates:
+        return []
+
+    # best[w]: up to `keep` (priority, positions) combinations of exactly w units, best first.
+    # A few extra are kept per weight for combinations that turn out not to pack into the gaps.
+    keep = 2 * k if len(gaps) > 1 else k
+    best = [[] for _ in range(capacity + 1)]
+    best[0] = [(0, ())]
+    for i, (minutes, weight, task) in enumerate(candidates):
+        priority = task["priority"]
+        for w in range(capacity, weight - 1, -1):
+            if not best[w - weight]:
+                continue
+            extended = [(value + priority, combo + (i,)) for value, combo in best[w - weight]]
+            best[w] = heapq.nlargest(keep, best[w] + extended, key=lambda option: option[0])
+
+    options = sorted(
+        ((value, sum(candidates[i][0] for i in combo), combo) for w in range(1, capacity + 1) for value, combo in best[w]),
+        key=lambda option: (-option[0], -option[1], option[2]),
+    )
+
+    fills = []
+    for value, total_minutes, combo in options:
+        durations = [candidates[i][0] for i in combo]
+        starts = _pack(durations, gaps, resolution)
+        if starts is None:
+            continue
+        chosen = [candidates[i][2] for i in combo]
+        entries = [
+            _schedule_entry(task, start, start + minutes)
+            for task, start, minutes in sorted(zip(chosen, starts, durations), key=lambda placed: placed[1])
+        ]
+        fills.append({
+            "tasks": chosen,
+            "entries": entries,
+            "priority": value,
+            "hours": total_minutes / MINUTES_PER_HOUR,
+        })
+        if len(fills) == k:
+            break
+    return fills
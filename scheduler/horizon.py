@@ -0,0 +1,35 @@
+from scheduler.core import _block_candidates, _fill_day
+from scheduler.tracing import active_tracer
+
+
+def plan_horizon(tasks, daily_hours, focus_tag="", resolution=1, tracer=None):
+    """
+    Spreads a backlog over several days, carrying whatever doesn't fit into the next day.
+
+    `daily_hours` lists each day's available hours, e.g. [6, 6, 6, 6, 6, 2, 0] for a week.
+    Every day is what generate_schedule would plan for the tasks still left, in their original
+    order. Tasks are scored and indexed once for the whole horizon: each day only pops the
+    tasks earlier days used off the shared candidate heaps, so a 30-day plan costs about one
+    scoring pass plus 30 days of slot filling.
+
+    Returns:
+    - Dict with "days", one schedule per entry of `daily_hours`, and "unscheduled", the tasks
+      that no day had room for, in their original order.
+    """
+    tracer = tracer if tracer is not None else active_tracer()
+    profiler = tracer.start_call() if tracer else None
+
+    try:
+        names, candidates = _block_candidates(tasks, focus_tag, tracer)
+        scheduled_tasks = set()
+        days = [
+            _fill_day(tasks, names, candidates, scheduled_tasks, available_hours, resolution, tracer)
+            for available_hours in daily_hours
+        ]
+    finally:
+        if tracer:
+            tracer.finish_call(profiler)
+    return {
+        "days": days,
+        "unscheduled": [task for name, task in zip(names, tasks) if name not in scheduled_tasks],
+    }
@@ -0,0 +1,208 @@
+import heapq
+import itertools
+
+from scheduler.cache import cached_generate_schedule
+from scheduler.core import DAY_END, DAY_START, ENERGY_BLOCKS, _schedule_entry, compute_task_score, energy_at
+from scheduler.timeline import MINUTES_PER_HOUR, Timeline, to_minutes
+
+
+class IncrementalPlanner:
+    """
+    Keeps a schedule up to date as single tasks are added, removed or edited.
+
+    Starts from the same schedule as generate_schedule. Each change only touches the slot of the
+    task involved and the gap it frees: every other assignment stays where it is. Unscheduled
+    tasks sit in per-block, per-duration heaps with lazy deletion, so repairing a gap costs
+    O(log n) per candidate instead of a rescan of the backlog.
+
+    Tasks are identified by name.
+    """
+
+    def __init__(self, tasks, available_hours, focus_tag="", resolution=1):
+        self.available_hours = available_hours
+        self.focus_tag = focus_tag
+        self.resolution = resolution
+
+        self.tasks = {}
+        self.entries = {}
+        self.used_hours = 0
+        self._assigned_hours = {}
+        self.timeline = Timeline(DAY_START, DAY_END, resolution)
+
+        self._versions = {}
+        self._order = {}
+        self._counter = itertools.count()
+        self._heaps = {energy_level: {} for energy_level in ENERGY_BLOCKS}
+        self._heap_entries = 0
+
+        for task in tasks:
+            self.tasks.setdefault(task["name"], task)
+        for task in self.tasks.values():
+            self._index(task)
+
+        for entry in cached_generate_schedule(list(self.tasks.values()), available_hours, focus_tag, resolution):
+            self._assign(self.tasks[entry["task"]], entry["start_minute"])
+
+    @property
+    def schedule(self):
+        # Copies, so callers can annotate entries without touching the planner's state
+        return [dict(entry) for entry in sorted(self.entries.values(), key=lambda e: e["start_minute"])]
+
+    def add_task(self, task):
+        if task["name"] in self.tasks:
+            return self.update_task(task)
+        self.tasks[task["name"]] = task
+        self._index(task)
+        self._place_anywhere(task)
+        return self.schedule
+
+    def remove_task(self, name):
+        if name not in self.tasks:
+            return self.schedule
+        del self.tasks[name]
+        # Its heap entries go stale without a version to match
+        del self._versions[name]
+        del self._order[name]
+        entry = self._unassign(name)
+        if entry:
+            self._fill(entry["start_minute"])
+        return self.schedule
+
+    def update_task(self, task):
+        name = task["name"]
+        if name not in self.tasks:
+            return self.add_task(task)
+        self.tasks[name] = task
+        self._index(task)
+
+        entry = self._unassign(name)
+        if entry is None:
+            self._place_anywhere(task)
+            return self.schedule
+
+        # Keep it where it was if it still fits there, then hand any freed time to other tasks
+        start = entry["start_minute"]
+        if not self._try_assign(task, start):
+            self._fill(start)
+            return self.schedule
+        end = self.entries[name]["end_minute"]
+        if end < entry["end_minute"]:
+            self._fill(self.timeline.next_free(end))
+        return self.schedule
+
+    def sync(self, tasks):
+        """
+        Applies whatever changed between the planner's tasks and `tasks` as individual edits.
+        """
+        incoming = {}
+        for task in tasks:
+            incoming.setdefault(task["name"], task)
+        for name in [name for name in self.tasks if name not in incoming]:
+            self.remove_task(name)
+        for name, task in incoming.items():
+            if name not in self.tasks:
+                self.add_task(task)
+            elif self.tasks[name] != task:
+                self.update_task(task)
+        return self.schedule
+
+    def _index(self, task):
+        name = task["name"]
+        # Versions come from one counter, so a removed and re-added task never matches its old entries
+        version = next(self._counter)
+        self._versions[name] = version
+        order = self._order.setdefault(name, version)
+        for energy_level, heaps in self._heaps.items():
+            score = compute_task_score(task, energy_level, self.focus_tag)
+            heapq.heappush(heaps.setdefault(task["duration"], []), (-score, order, name, version))
+        self._heap_entries += len(self._heaps)
+
+        # Every edit leaves stale entries behind; rebuild once they outnumber the live ones
+        if self._heap_entries > 2 * len(self._heaps) * len(self.tasks) + 64:
+            self._compact()
+
+    def _current(self, heap_entry):
+        # Entry for the latest version of a task that is still there
+        return heap_entry[3] == self._versions.get(heap_entry[2])
+
+    def _compact(self):
+        # Scheduled tasks keep their entries: update_task reindexes a task before unassigning it
+        self._heap_entries = 0
+        for energy_level, heaps in self._heaps.items():
+            compacted = {}
+            for duration, heap in heaps.items():
+                heap = [heap_entry for heap_entry in heap if self._current(heap_entry)]
+                if heap:
+                    heapq.heapify(heap)
+                    compacted[duration] = heap
+                    self._heap_entries += len(heap)
+            self._heaps[energy_level] = compacted
+
+    def _fits(self, task, start):
+        end = start + to_minutes(task["duration"])
+        return self.used_hours + task["duration"] <= self.available_hours and self.timeline.is_free(start, end)
+
+    def _assign(self, task, start):
+        end = start + to_minutes(task["duration"])
+        self.entries[task["name"]] = _schedule_entry(task, start, end)
+        self._assigned_hours[task["name"]] = task["duration"]
+        self.used_hours += task["duration"]
+        self.timeline.occupy(start, end)
+
+    def _try_assign(self, task, start):
+        if not self._fits(task, start):
+            return False
+        self._assign(task, start)
+        return True
+
+    def _unassign(self, name):
+        entry = self.entries.pop(name, None)
+        if entry is None:
+            return None
+        self.timeline.release(entry["start_minute"], entry["end_minute"])
+        # The task may have been edited since it was placed, so give back what it was charged
+        self.used_hours -= self._assigned_hours.pop(name)
+        return entry
+
+    def _place_anywhere(self, task):
+        # Earliest free slot that fits; existing assignments are never moved
+        for gap_start, gap_end in self.timeline.free_gaps():
+            start = self.timeline.align(gap_start)
+            if start + to_minutes(task["duration"]) <= gap_end:
+                return self._try_assign(task, start)
+        return False
+
+    def _best_in(self, energy_level, minute, gap_end):
+        best = None
+        heaps = self._heaps[energy_level]
+        for duration in sorted(heaps):
+            if self.used_hours + duration > self.available_hours or minute + to_minutes(duration) > gap_end:
+                break
+            heap = heaps[duration]
+            # Lazy deletion: drop stale versions, removed tasks and tasks already scheduled
+            while heap and (not self._current(heap[0]) or heap[0][2] in self.entries):
+                heapq.heappop(heap)
+                self._heap_entries -= 1
+            # generate_schedule only takes a task whose score beats its starting best_score of -1
+            if heap and -heap[0][0] > -1 and (best is None or heap[0] < best):
+                best = heap[0]
+        return best
+
+    def _fill(self, minute):
+        # Greedy refill of the free gap around `minute`, same rules as generate_schedule
+        gap = self.timeline.gap_at(minute)
+        if gap is None:
+            return
+        minute = self.timeline.align(max(minute, gap[0]))
+        gap_end = gap[1]
+        while minute < gap_end and self.used_hours < self.available_hours:
+            energy_level = energy_at(minute)
+            best = self._best_in(energy_level, minute, gap_end)
+            if best is None:
+                # Nothing fits until the energy block changes
+                block_end = ENERGY_BLOCKS[energy_level].stop * MINUTES_PER_HOUR
+                minute = self.timeline.align(block_end)
+                continue
+            task = self.tasks[best[2]]
+            self._assign(task, minute)
+            minute = self.timeline.align(max(minute + to_minutes(task["duration"]), minute + self.resolution))
@@ -0,0 +1,461 @@
+"""
+Serves generate_schedule and get_smart_suggestions as a JSON-over-HTTP service, standard library only.
+
+    python -m scheduler.service --port 8080 --workers 4
+
+    POST /schedule     {"tasks": [...], "available_hours": 6, "focus_tag": "ml", "resolution": 1}
+                       -> {"schedule": [...]}
+    POST /suggestions  {"tasks": [...], "used_tasks": [...], "unused_time": 2, "focus_tag": ""}
+                       -> {"suggestions": [...]}
+    GET  /metrics      request counts, latency percentiles, coalescing and batching counters
+    GET  /health       {"status": "ok"}
+
+Scheduling runs on a process pool. Identical requests in flight at the same time share one
+computation, and schedule requests that arrive within `batch_window` seconds of each other are
+sent to a worker together. Once `max_pending` computations are queued or running, new ones are
+turned away with 503 and a Retry-After header instead of piling up.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import multiprocessing
+import os
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from scheduler.cache import schedule_key
+from scheduler.core import _encode, _schedule_chunk
+from utils.task_utils import get_smart_suggestions, normalize_task
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY = 8 * 1024 * 1024
+MAX_HEADERS = 100
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _suggest(payload):
+    # Runs in a worker: payload is an encoded, already validated suggestions request
+    request = json.loads(payload)
+    suggestions = get_smart_suggestions(
+        request["tasks"], set(request["used_tasks"]), request["unused_time"], request["focus_tag"]
+    )
+    return _encode(suggestions)
+
+
+class LatencyStats:
+    """
+    Request count, errors and latency percentiles over the last `window` requests.
+    """
+
+    def __init__(self, window=1000):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+    def record(self, seconds, ok=True):
+        self.count += 1
+        self.errors += not ok
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def summary(self):
+        recent = sorted(self.recent)
+
+        def percentile(p):
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1000, 3) if recent else 0
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "latency_ms": {
+                "mean": round(self.total / self.count * 1000, 3) if self.count else 0,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(recent[-1] * 1000, 3) if recent else 0,
+            },
+        }
+
+
+class ScheduleService:
+    """
+    The request handling behind the HTTP server; `schedule` and `suggestions` can also be awaited directly.
+
+    `max_workers=0` computes on a single thread instead of a process pool, which is handy for
+    debugging. `batch_size` and `batch_window` bound how many schedule requests go to a worker
+    at once and how long the first of them may wait for company.
+    """
+
+    def __init__(self, max_workers=None, batch_size=32, batch_window=0.002, max_pending=1024):
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_pending = max_pending
+        self.latency = defaultdict(LatencyStats)
+        self.coalesced = 0
+        self.rejected = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self._inflight = {}
+        self._queue = None
+        self._pool = None
+        self._batch_slots = None
+        self._batcher = None
+        self._server = None
+        self._background = set()
+
+    # -- Lifecycle --
+    async def start(self, host="127.0.0.1", port=8080):
+        if self.max_workers == 0:
+            self._pool = ThreadPoolExecutor(max_workers=1)
+            workers = 1
+        else:
+            self._pool = self._process_pool()
+            workers = self.max_workers or os.cpu_count() or 1
+            # Start the workers before any socket is open, so they don't wait for the first request
+            await asyncio.get_running_loop().run_in_executor(self._pool, _schedule_chunk, [], 1)
+        # Two batches per worker keep the pool busy; later requests wait in the queue and batch up
+        self._batch_slots = asyncio.Semaphore(2 * workers)
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._batch_loop())
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    def _process_pool(self):
+        # Workers come from a fork server, never from this process, so a pool rebuilt while the
+        # server is up can't inherit client sockets and hold their connections open
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+
+    async def _execute(self, fn, *args):
+        pool = self._pool
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            # A worker died: this request fails, later ones get a fresh pool
+            if self._pool is pool:
+                logger.error("process pool broke, starting a new one")
+                self._pool = self._process_pool()
+                pool.shutdown(wait=False)
+            raise
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+        if self._pool:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def metrics(self):
+        return {
+            "routes": {route: stats.summary() for route, stats in self.latency.items()},
+            "pending": len(self._inflight),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "mean_batch_size": round(self.batched_requests / self.batches, 2) if self.batches else 0,
+        }
+
+    # -- Endpoints --
+    async def schedule(self, request):
+        tasks = self._tasks(request)
+        try:
+            available_hours = float(request.get("available_hours", 6))
+            resolution = int(request.get("resolution", 1))
+        except (TypeError, ValueError):
+            raise HTTPError(400, "available_hours and resolution must be numbers")
+        if not math.isfinite(available_hours):
+            raise HTTPError(400, "available_hours must be finite")
+        if resolution < 1:
+            raise HTTPError(400, "resolution must be at least 1")
+        focus_tag = str(request.get("focus_tag") or "")
+
+        key = ("schedule", schedule_key(tasks, available_hours, focus_tag, resolution))
+        payload = _encode({"tasks": tasks, "available_hours": available_hours, "focus_tag": focus_tag})
+        schedule = await self._submit(key, lambda future: self._queue.put_nowait((resolution, payload, future)))
+        return {"schedule": schedule}
+
+    async def suggestions(self, request):
+        tasks = self._tasks(request)
+        try:
+            unused_time = float(request.get("unused_time", 0))
+        except (TypeError, ValueError):
+            raise HTTPError(400, "unused_time must be a number")
+        if not math.isfinite(unused_time):
+            raise HTTPError(400, "unused_time must be finite")
+        used_tasks = request.get("used_tasks", [])
+        if not isinstance(used_tasks, list):
+            raise HTTPError(400, "used_tasks must be a list of task names")
+        payload = _encode({
+            "tasks": tasks,
+            "used_tasks": sorted(str(name) for name in used_tasks),
+            "unused_time": unused_time,
+            "focus_tag": str(request.get("focus_tag") or ""),
+        })
+
+        key = ("suggestions", hashlib.sha256(payload).hexdigest())
+        suggestions = await self._submit(key, lambda future: self._run(future, _suggest, payload))
+        return {"suggestions": suggestions}
+
+    def _tasks(self, request):
+        if not isinstance(request, dict):
+            raise HTTPError(400, "request body must be a JSON object")
+        tasks = request.get("tasks")
+        if not isinstance(tasks, list):
+            raise HTTPError(400, "tasks must be a list")
+        try:
+            return [normalize_task(task) for task in tasks]
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+
+    # -- Coalescing and backpressure --
+    async def _submit(self, key, start):
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            if len(self._inflight) >= self.max_pending:
+                self.rejected += 1
+                raise HTTPError(503, "server is busy, retry shortly")
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            start(future)
+        # Shielded so one client hanging up doesn't cancel the result others are waiting for
+        return await asyncio.shield(future)
+
+    def _run(self, future, fn, payload):
+        async def run():
+            try:
+                result = await self._execute(fn, payload)
+                future.set_result(json.loads(result))
+            except Exception as e:
+                future.set_exception(e)
+
+        self._spawn(run())
+
+    def _spawn(self, coro):
+        # The event loop only keeps weak references to tasks, so hold one until it is done
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    # -- Micro-batching --
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._batch_slots.acquire()
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.batch_size:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._queue.get_nowait())
+            self._spawn(self._run_batch(batch))
+
+    async def _run_batch(self, batch):
+        try:
+            by_resolution = defaultdict(list)
+            for resolution, payload, future in batch:
+                by_resolution[resolution].append((payload, future))
+            for resolution, items in by_resolution.items():
+                self.batches += 1
+                self.batched_requests += len(items)
+                chunk = [(index, payload) for index, (payload, _) in enumerate(items)]
+                try:
+                    results = json.loads(await self._execute(_schedule_chunk, chunk, resolution))
+                except Exception as e:
+                    for _, future in items:
+                        future.set_exception(e)
+                    continue
+                for index, schedule, error in results:
+                    future = items[index][1]
+                    if error:
+                        future.set_exception(HTTPError(400, error))
+                    else:
+                        future.set_result(schedule)
+        finally:
+            self._batch_slots.release()
+
+    # -- HTTP --
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    await self._respond(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+
+                started = time.perf_counter()
+                status, result, route = await self._dispatch(method, path, body)
+                elapsed = time.perf_counter() - started
+                if route:
+                    self.latency[route].record(elapsed, ok=status == 200)
+
+                headers = {"X-Response-Time-Ms": f"{elapsed * 1000:.3f}"}
+                if status == 503:
+                    headers["Retry-After"] = "1"
+                await self._respond(writer, status, result, keep_alive, headers)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body):
+        path = path.split("?", 1)[0]
+        routes = {
+            ("GET", "/health"): None,
+            ("GET", "/metrics"): None,
+            ("POST", "/schedule"): self.schedule,
+            ("POST", "/suggestions"): self.suggestions,
+        }
+        if (method, path) not in routes:
+            if any(route_path == path for _, route_path in routes):
+                return 405, {"error": f"{method} not allowed on {path}"}, None
+            return 404, {"error": f"no route {path}"}, None
+        if path == "/health":
+            return 200, {"status": "ok"}, None
+        if path == "/metrics":
+            return 200, self.metrics(), None
+
+        try:
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError as e:
+                raise HTTPError(400, f"invalid JSON ({e})")
+            return 200, await routes[(method, path)](request), path
+        except HTTPError as e:
+            return e.status, {"error": str(e)}, path
+        except Exception:
+            # Bad input is rejected with an HTTPError above, so anything else is our failure
+            logger.exception("request to %s failed", path)
+            return 500, {"error": "internal server error"}, path
+
+    async def _read_request(self, reader):
+        # Returns (method, path, body, keep_alive), or None once the client has closed the connection
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, path, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "malformed request line")
+
+        headers = {}
+        for _ in range(MAX_HEADERS):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise HTTPError(400, "too many headers")
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "invalid Content-Length")
+        if length < 0:
+            raise HTTPError(400, "invalid Content-Length")
+        if length > MAX_BODY:
+            raise HTTPError(413, f"body larger than {MAX_BODY} bytes")
+        body = await reader.readexactly(length) if length else b""
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method.upper(), path, body, keep_alive
+
+    async def _respond(self, writer, status, result, keep_alive, headers=None):
+        body = _encode(result)
+        lines = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(host, port, **options):
+    service = ScheduleService(**options)
+    server = await service.start(host, port)
+    logger.info("serving on %s", ", ".join(str(sock.getsockname()) for sock in server.sockets))
+    try:
+        await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the scheduler as a JSON HTTP service.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count, 0: one thread)")
+    parser.add_argument("--batch-size", type=int, default=32, help="most schedule requests sent to a worker at once")
+    parser.add_argument("--batch-window", type=float, default=0.002, help="seconds to wait for a batch to fill")
+    parser.add_argument("--max-pending", type=int, default=1024, help="computations queued or running before 503s")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        asyncio.run(serve(
+            args.host,
+            args.port,
+            max_workers=args.workers,
+            batch_size=args.batch_size,
+            batch_window=args.batch_window,
+            max_pending=args.max_pending,
+        ))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,115 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from scheduler.core import ENERGY_BLOCKS, _build_candidate_index, _fill_day, _focus_mask, compute_score_matrix
+from scheduler.tasks import task_columns
+from scheduler.timeline import entry_hours
+
+
+class _Sweep:
+    """
+    Schedules grid points against scores shared by the whole grid.
+
+    The focus-independent scores come in precomputed; each focus tag only adds its +10 column
+    and builds its candidate heaps once, and every hours value under that tag starts from a
+    copy of those heaps.
+    """
+
+    def __init__(self, tasks, base_scores):
+        self.tasks = tasks
+        self.names, self.durations = task_columns(tasks)
+        self.base_scores = base_scores
+        self._candidates = {}
+
+    def candidates(self, focus_tag):
+        key = focus_tag.lower()
+        if key not in self._candidates:
+            scores = self.base_scores
+            if focus_tag:
+                scores = scores + _focus_mask(self.tasks, focus_tag).reshape(-1, 1) * 10
+            self._candidates[key] = {
+                energy_level: _build_candidate_index(self.durations, scores[:, col].tolist())
+                for col, energy_level in enumerate(ENERGY_BLOCKS)
+            }
+        return self._candidates[key]
+
+    def run(self, points, resolution=1):
+        results = []
+        for available_hours, focus_tag in points:
+            # The greedy pops scheduled tasks off the heaps, so every point gets its own copies
+            candidates = {
+                energy_level: ({duration: list(heap) for duration, heap in index.items()}, sorted(index))
+                for energy_level, index in self.candidates(focus_tag).items()
+            }
+            schedule = _fill_day(self.tasks, self.names, candidates, set(), available_hours, resolution)
+            results.append((available_hours, focus_tag, schedule))
+        return results
+
+
+_worker_sweep = None
+
+
+def _init_worker(tasks, base_scores):
+    global _worker_sweep
+    _worker_sweep = _Sweep(tasks, base_scores)
+
+
+def _run_points(points, resolution):
+    return _worker_sweep.run(points, resolution)
+
+
+def pareto_frontier(points):
+    """
+    The points no other point beats on both "utilization" and "priority", by utilization, highest first.
+    """
+    frontier = []
+    for point in sorted(points, key=lambda p: (-p["utilization"], -p["priority"])):
+        if not frontier or point["priority"] > frontier[-1]["priority"]:
+            frontier.append(point)
+    return frontier
+
+
+def sweep_schedules(tasks, hours_options=range(1, 15), focus_tags=("",), resolution=1, max_workers=0):
+    """
+    Schedules every (available_hours, focus_tag) pair of the grid in one call.
+
+    Gives the same schedules as calling generate_schedule on each pair, but tasks are scored
+    once: the focus-independent part of the score is shared by the whole grid and each focus
+    tag only adds its bonus. With `max_workers` above 0 (or None for one per CPU) the grid
+    points are spread over a process pool, which receives the shared scores once per worker.
+
+    Returns:
+    - Dict with "points", one per grid point in grid order, each with "available_hours",
+      "focus_tag", "schedule", "hours_used", "utilization" (hours_used / available_hours)
+      and "priority" (total priority of the scheduled tasks), and "frontier", the points
+      that trade utilization against total priority best (see pareto_frontier).
+    """
+    base_scores = compute_score_matrix(tasks, ENERGY_BLOCKS)
+    grid = [(available_hours, focus_tag) for focus_tag in focus_tags for available_hours in hours_options]
+
+    if max_workers == 0 or len(grid) < 2:
+        results = _Sweep(tasks, base_scores).run(grid, resolution)
+    else:
+        workers = min(max_workers or os.cpu_count() or 1, len(grid))
+        # Consecutive points share a focus tag, so each worker builds few candidate indexes
+        chunk_size = -(-len(grid) // workers)
+        chunks = [grid[i:i + chunk_size] for i in range(0, len(grid), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tasks, base_scores)) as pool:
+            results = [result for chunk in pool.map(_run_points, chunks, [resolution] * len(chunks)) for result in chunk]
+
+    priorities = {}
+    for task in tasks:
+        priorities.setdefault(task["name"], task["priority"])
+
+    points = []
+    for available_hours, focus_tag, schedule in results:
+        hours_used = sum(entry_hours(entry) for entry in schedule)
+        points.append({
+            "available_hours": available_hours,
+            "focus_tag": focus_tag,
+            "schedule": schedule,
+            "hours_used": hours_used,
+            "utilization": hours_used / available_hours if available_hours else 0,
+            "priority": sum(priorities[entry["task"]] for entry in schedule),
+        })
+    return {"points": points, "frontier": pareto_frontier(points)}
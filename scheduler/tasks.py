@@ -0,0 +1,225 @@
+import sys
+
+import numpy as np
+
+TASK_FIELDS = ("name", "duration", "priority", "type", "energy", "tags")
+
+
+class Interner:
+    """
+    Maps strings to small integer codes and back, so repeated values are stored once.
+    """
+
+    def __init__(self, values=()):
+        self.codes = {}
+        self.values = []
+        for value in values:
+            self.code(value)
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+
+    def value(self, code):
+        return self.values[code]
+
+
+
+class Task:
+    """
+    One task with __slots__ and interned strings instead of a dict.
+
+    Reads like the task dicts used everywhere else (task["name"], task.get("tags", [])), so it
+    can be passed to any function that takes those. Energy, type and tags go through
+    sys.intern, so tasks share one copy of each and it is freed with the last task using it.
+    """
+
+    __slots__ = ("name", "duration", "priority", "energy", "type", "tag_values")
+
+    def __init__(self, name, duration, priority, energy, type="Personal", tags=()):
+        self.name = name
+        self.duration = duration
+        self.priority = priority
+        self.energy = sys.intern(energy)
+        self.type = sys.intern(type)
+        self.tag_values = tuple(sys.intern(tag) for tag in tags)
+
+    @classmethod
+    def from_dict(cls, task):
+        return cls(task["name"], task["duration"], task["priority"], task["energy"], task.get("type", "Personal"), task.get("tags", []))
+
+    @property
+    def tags(self):
+        return list(self.tag_values)
+
+    def __getitem__(self, key):
+        if key not in TASK_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in TASK_FIELDS else default
+
+    def __contains__(self, key):
+        return key in TASK_FIELDS
+
+    def keys(self):
+        return TASK_FIELDS
+
+    def __eq__(self, other):
+        if isinstance(other, Task):
+            return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, slot) for slot in self.__slots__))
+
+    def __repr__(self):
+        return f"Task({self.to_dict()!r})"
+
+    def to_dict(self):
+        return {key: self[key] for key in TASK_FIELDS}
+
+
+class TaskTable:
+    """
+    Columnar task list: NumPy arrays for duration, priority and the energy/type codes, and the
+    tags of every task as one flat array of tag ids with per-task offsets.
+
+    Codes index the table's own `energies`, `types` and `tags` interners, which subsets made by
+    take() share, so a vocabulary lives exactly as long as the tables using it.
+
+    Indexing with an int gives a Task; iterating yields Tasks in order, so scheduler and filter
+    functions accept a TaskTable wherever they accept a list of task dicts.
+    """
+
+    def __init__(self, names, duration, priority, energy_code, type_code, tag_offsets, tag_ids, energies, types, tags):
+        self.names = names
+        self.duration = duration
+        self.priority = priority
+        self.energy_code = energy_code
+        self.type_code = type_code
+        self.tag_offsets = tag_offsets
+        self.tag_ids = tag_ids
+        self.energies = energies
+        self.types = types
+        self.tags = tags
+        self._folded_tags = None
+
+    @classmethod
+    def from_tasks(cls, tasks):
+        if isinstance(tasks, TaskTable):
+            return tasks
+        energies, types, tags = Interner(), Interner(), Interner()
+        names, duration, priority, energy_code, type_code = [], [], [], [], []
+        tag_offsets, tag_ids = [0], []
+        for task in tasks:
+            names.append(task["name"])
+            duration.append(task["duration"])
+            priority.append(task["priority"])
+            energy_code.append(energies.code(task["energy"]))
+            type_code.append(types.code(task.get("type", "Personal")))
+            tag_ids.extend(tags.code(tag) for tag in task.get("tags", []))
+            tag_offsets.append(len(tag_ids))
+        return cls(
+            names,
+            np.array(duration),
+            np.array(priority),
+            np.array(energy_code, dtype=np.int16),
+            np.array(type_code, dtype=np.int16),
+            np.array(tag_offsets, dtype=np.int64),
+            np.array(tag_ids, dtype=np.int32),
+            energies,
+            types,
+            tags,
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, i):
+        task = Task.__new__(Task)
+        task.name = self.names[i]
+        task.duration = self.duration[i].item()
+        task.priority = self.priority[i].item()
+        task.energy = self.energies.value(self.energy_code[i])
+        task.type = self.types.value(self.type_code[i])
+        task.tag_values = tuple(self.tags.values[tag_id] for tag_id in self.tag_ids[self.tag_offsets[i]:self.tag_offsets[i + 1]].tolist())
+        return task
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def take(self, indices):
+        # Subset (bool mask or positions) as a new TaskTable, keeping order
+        indices = np.flatnonzero(indices) if np.asarray(indices).dtype == bool else np.asarray(indices, dtype=np.int64)
+        starts, ends = self.tag_offsets[indices], self.tag_offsets[indices + 1]
+        lengths = ends - starts
+        tag_ids = np.concatenate([self.tag_ids[s:e] for s, e in zip(starts, ends)]) if len(indices) else self.tag_ids[:0]
+        return TaskTable(
+            [self.names[i] for i in indices.tolist()],
+            self.duration[indices],
+            self.priority[indices],
+            self.energy_code[indices],
+            self.type_code[indices],
+            np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+            tag_ids.astype(np.int32),
+            self.energies,
+            self.types,
+            self.tags,
+        )
+
+    def to_dicts(self):
+        return [task.to_dict() for task in self]
+
+    def rows_with_tags(self, tag_ids):
+        # Bool array: which tasks carry at least one of `tag_ids`
+        if not len(tag_ids):
+            return np.zeros(len(self), dtype=bool)
+        hits = np.isin(self.tag_ids, list(tag_ids))
+        # Count hits per task from the offsets
+        counts = np.concatenate([[0], np.cumsum(hits)])
+        return counts[self.tag_offsets[1:]] > counts[self.tag_offsets[:-1]]
+
+    def has_tag(self, tag):
+        """
+        Bool array: which tasks carry `tag`, ignoring case.
+        """
+        if self._folded_tags is None:
+            # Lowercased tag -> ids of every spelling of it, built once per table
+            self._folded_tags = {}
+            for tag_id, value in enumerate(self.tags.values):
+                self._folded_tags.setdefault(value.lower(), []).append(tag_id)
+        return self.rows_with_tags(self._folded_tags.get(tag.lower(), []))
+
+    def has_any_tag(self, tags):
+        """
+        Bool array: which tasks carry any of `tags`, matching case exactly.
+        """
+        return self.rows_with_tags([self.tags.codes[tag] for tag in tags if tag in self.tags.codes])
+
+    def has_type(self, task_type):
+        """
+        Bool array: which tasks are of `task_type`, ignoring case.
+        """
+        folded = task_type.lower()
+        return np.isin(self.type_code, [code for code, value in enumerate(self.types.values) if value.lower() == folded])
+
+
+def task_columns(tasks):
+    # (names, durations) as plain lists, straight from the columns when given a TaskTable
+    if isinstance(tasks, TaskTable):
+        return tasks.names, tasks.duration.tolist()
+    return [task["name"] for task in tasks], [task["duration"] for task in tasks]
+
+
+def to_jsonable(obj):
+    # json.dumps `default` hook for Task and TaskTable
+    if isinstance(obj, Task):
+        return obj.to_dict()
+    if isinstance(obj, TaskTable):
+        return obj.to_dicts()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,132 @@
+from bisect import bisect_left, bisect_right
+
+MINUTES_PER_HOUR = 60
+
+
+def to_minutes(hours):
+    return int(round(hours * MINUTES_PER_HOUR))
+
+
+def format_minutes(minute):
+    return f"{minute // MINUTES_PER_HOUR}:{minute % MINUTES_PER_HOUR:02d}"
+
+
+def parse_clock(text):
+    hours, minutes = text.split(":")
+    return int(hours) * MINUTES_PER_HOUR + int(minutes)
+
+
+def entry_minutes(entry):
+    """
+    (start, end) of a schedule entry in minutes since midnight.
+
+    Uses the numeric "start_minute"/"end_minute" fields, falling back to the "H:MM"
+    strings for schedules saved before those fields existed.
+    """
+    if "start_minute" in entry and "end_minute" in entry:
+        return entry["start_minute"], entry["end_minute"]
+    return parse_clock(entry["start"]), parse_clock(entry["end"])
+
+
+def entry_hours(entry):
+    start, end = entry_minutes(entry)
+    return (end - start) / MINUTES_PER_HOUR
+
+
+class Timeline:
+    """
+    Occupied time within [start, end), kept as a sorted array of disjoint intervals.
+
+    Times are integer minutes since midnight. Tasks start on multiples of `resolution`
+    minutes (counted from `start`), and every query is a binary search over the intervals,
+    so finer resolutions cost nothing extra.
+    """
+
+    def __init__(self, start, end, resolution=1):
+        self.start = start
+        self.end = end
+        self.resolution = resolution
+        self._starts = []
+        self._ends = []
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __iter__(self):
+        return zip(self._starts, self._ends)
+
+    def align(self, minute):
+        # Round up to the next slot boundary
+        offset = (minute - self.start) % self.resolution
+        return minute + (self.resolution - offset if offset else 0)
+
+    def is_free(self, start, end):
+        if start < self.start or end > self.end:
+            return False
+        # First interval that ends after `start` must begin at or after `end`
+        i = bisect_right(self._ends, start)
+        return i == len(self._starts) or self._starts[i] >= end
+
+    def occupy(self, start, end):
+        if end <= start:
+            return
+        # Merge with every interval that overlaps or touches [start, end)
+        lo = bisect_left(self._ends, start)
+        hi = bisect_right(self._starts, end)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def release(self, start, end):
+        if end <= start:
+            return
+        lo = bisect_right(self._ends, start)
+        hi = bisect_left(self._starts, end)
+        if lo >= hi:
+            return
+        # Keep whatever sticks out on either side of [start, end)
+        starts, ends = [], []
+        if self._starts[lo] < start:
+            starts.append(self._starts[lo])
+            ends.append(start)
+        if self._ends[hi - 1] > end:
+            starts.append(end)
+            ends.append(self._ends[hi - 1])
+        self._starts[lo:hi] = starts
+        self._ends[lo:hi] = ends
+
+    def next_free(self, minute):
+        # Earliest free slot boundary at or after `minute`, or `end` when the rest is full
+        minute = self.align(max(minute, self.start))
+        i = bisect_right(self._ends, minute)
+        while i < len(self._starts) and self._starts[i] <= minute:
+            minute = self.align(self._ends[i])
+            i = bisect_right(self._ends, minute)
+        return min(minute, self.end)
+
+    def gap_at(self, minute):
+        # (start, end) of the free gap containing `minute`, or None if it is occupied
+        if minute < self.start or minute >= self.end:
+            return None
+        i = bisect_right(self._ends, minute)
+        if i < len(self._starts) and self._starts[i] <= minute:
+            return None
+        gap_start = self._ends[i - 1] if i > 0 else self.start
+        gap_end = self._starts[i] if i < len(self._starts) else self.end
+        return gap_start, gap_end
+
+    def free_gaps(self):
+        gaps = []
+        cursor = self.start
+        for start, end in self:
+            if start > cursor:
+                gaps.append((cursor, start))
+            cursor = max(cursor, end)
+        if cursor < self.end:
+            gaps.append((cursor, self.end))
+        return gaps
+
+    def occupied_minutes(self):
+        return sum(end - start for start, end in self)
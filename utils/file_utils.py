@@ -1,35 +1,85 @@
+import atexit
 import os
-import json
-from datetime import datetime
+from datetime import date
+
+from utils.store import TaskStore
+from utils.write_behind import WriteBehind
 
 #Defining directories and file paths
 SAVE_DIR = os.path.join("data")
-SAVE_PATH = os.path.join(SAVE_DIR, "saved_tasks.json")
-TODAY_SCHEDULE_PATH = os.path.join(SAVE_DIR, f"schedule_{datetime.now().strftime('%Y%m%d')}.json")
+DB_PATH = os.path.join(SAVE_DIR, "time_optimizer.db")
+HISTORY_DIR = os.path.join(SAVE_DIR, "history")
 
 os.makedirs(SAVE_DIR, exist_ok=True) #create directory if not there
 
-#Saving task to disk
+#All saves go through one transactional store instead of rewriting JSON files
+_store = None
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = TaskStore(DB_PATH)
+        _store.import_json_files(SAVE_DIR)
+    return _store
+
+#Saves return at once and are written on a background thread; loads flush pending saves first
+_writer = None
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        _writer = WriteBehind()
+        atexit.register(_writer.close)
+    return _writer
+
+def save_stats():
+    # Queue depth, coalesced saves and write latency of the background writer
+    return get_writer().stats()
+
+#Saving task to disk (copies, so later edits by the caller don't change what gets written)
 def save_tasks(tasks):
-    with open(SAVE_PATH, "w") as f:
-        json.dump(tasks, f, indent=2)
-        
+    get_writer().submit("tasks", get_store().save_tasks, [dict(task) for task in tasks])
+
+#Saving or deleting a single task without rewriting the rest
+def save_task(task):
+    get_writer().submit(("task", task["name"]), get_store().upsert_task, dict(task))
+
+def delete_task(name):
+    get_writer().submit(("task", name), get_store().delete_task, name)
+
+def clear_tasks():
+    get_writer().submit("tasks", get_store().clear_tasks)
 
 #Load task
 def load_tasks():
-    if os.path.exists(SAVE_PATH):
-        with open(SAVE_PATH, "r") as f:
-            data = json.load(f)
-            return data.get("tasks", []), data.get("last_updated", "Unknown")
-    return [], "Unknown"
+    get_writer().flush()
+    return get_store().load_tasks()
 
 #Saving and loading today's schedule separeately
-def save_today_schedule(schedule):
-    with open(TODAY_SCHEDULE_PATH, "w") as f:
-        json.dump(schedule, f, indent=2)
+def save_today_schedule(schedule, available_hours=None):
+    day = date.today()
+    get_writer().submit(("schedule", day), get_store().save_schedule, [dict(s) for s in schedule], day)
+    # Queued on its own, so a later save without hours can't coalesce them away
+    if available_hours is not None:
+        get_writer().submit(("available_hours", day), get_store().save_available_hours, day, available_hours)
 
 def load_today_schedule():
-    if os.path.exists(TODAY_SCHEDULE_PATH):
-        with open(TODAY_SCHEDULE_PATH, "r") as f:
-            return json.load(f)
-    return []
\ No newline at end of file
+    get_writer().flush()
+    return get_store().load_schedule(date.today())
+
+#Schedules for a date range, as {"YYYY-MM-DD": schedule}
+def load_schedules_between(start, end):
+    get_writer().flush()
+    return get_store().schedules_between(start, end)
+
+#Columnar archive of past days, brought up to date with the store whenever it is asked for
+_history = None
+
+def get_history():
+    global _history
+    if _history is None:
+        from utils.history import HistoryArchive
+        _history = HistoryArchive(HISTORY_DIR)
+    # No flush: queued saves are for today, and compaction stops at yesterday
+    _history.compact(get_store())
+    return _history
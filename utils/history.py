@@ -0,0 +1,343 @@
+import contextlib
+import json
+import os
+import tempfile
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+
+from scheduler.tasks import Interner
+from scheduler.timeline import MINUTES_PER_HOUR, entry_minutes
+
+# Per-entry columns, in schedule order, day after day
+ENTRY_COLUMNS = {
+    "day": np.int32,       # Position of the entry's day in the day columns
+    "start": np.int16,     # Minutes since midnight
+    "end": np.int16,
+    "energy": np.int8,     # Codes into meta.json "energies"
+    "type": np.int16,      # Codes into meta.json "types"
+    "priority": np.float32,  # NaN when unknown
+}
+# Per-day columns, sorted by day: the date index
+DAY_COLUMNS = {
+    "ordinal": np.int32,       # date.toordinal()
+    "offset": np.int64,        # Index of the day's first entry
+    "available": np.float32,   # Available hours, NaN when not recorded
+}
+
+MAX_PRIORITY = 5
+FEATURES = 9  # Bias, one per weekday, available hours
+RIDGE = 1.0
+
+
+def productivity_score(weighted_hours, hours_used, available_hours):
+    """
+    0-100: how much of the day went to top-priority work.
+
+    `weighted_hours` is the sum of priority * hours over the day's tasks. A day whose available
+    time was all spent on priority-5 tasks scores 100. Days with unknown available hours are
+    measured against the hours actually used. Works on scalars and on NumPy arrays.
+    """
+    capacity = np.fmax(np.nan_to_num(available_hours, nan=0), hours_used)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(capacity > 0, 100 * weighted_hours / (MAX_PRIORITY * capacity), np.nan)
+
+
+def _features(ordinals, available_hours):
+    ordinals = np.asarray(ordinals)
+    x = np.zeros((len(ordinals), FEATURES))
+    x[:, 0] = 1
+    x[np.arange(len(ordinals)), 1 + (ordinals - 1) % 7] = 1  # Ordinal 1 (0001-01-01) was a Monday
+    x[:, 8] = available_hours
+    return x
+
+
+class HistoryArchive:
+    """
+    Past schedules compacted into NumPy columns, one .npy file per column, read memory-mapped.
+
+    Entries are stored day after day and the sorted day columns index them, so any date range
+    is a pair of binary searches and a zero-copy slice. Aggregates are a few bincounts over
+    those slices instead of parsing one JSON document per day.
+
+    The archive only grows: compact() appends the days after the last archived one, and the
+    productivity model is trained incrementally by adding each new day to its normal equations.
+
+    meta.json is the manifest: it is replaced last and records how many entries and days are
+    committed, so an append cut short leaves the previous archive intact. Appends are serialized
+    by a lock, so one archive can be shared by every session thread.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.RLock()
+        meta = self._read_meta()
+        self.energies = Interner(meta.get("energies", ["high", "medium", "low"]))
+        self.types = Interner(meta.get("types", []))
+        self._xtx = np.array(meta.get("xtx", np.zeros((FEATURES, FEATURES)).tolist()))
+        self._xty = np.array(meta.get("xty", np.zeros(FEATURES).tolist()))
+        self.trained_days = meta.get("trained_days", 0)
+        self._open(meta.get("entries", 0), meta.get("days", 0))
+
+    def __len__(self):
+        return len(self.days["ordinal"])
+
+    @property
+    def last_day(self):
+        return date.fromordinal(int(self.days["ordinal"][-1])) if len(self) else None
+
+    # -- Storage --
+    def _column_path(self, name):
+        return os.path.join(self.path, f"{name}.npy")
+
+    def _read_meta(self):
+        try:
+            with open(os.path.join(self.path, "meta.json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _open(self, entry_count, day_count):
+        # Counts come from the manifest; without one nothing has been committed yet
+        def load(name, dtype, count):
+            path = self._column_path(name)
+            if not count or not os.path.exists(path):
+                return np.zeros(0, dtype=dtype)
+            # Rows past the manifest's count belong to an append that never committed
+            column = np.load(path, mmap_mode="r")[:count]
+            return column if len(column) else np.zeros(0, dtype=dtype)
+
+        # Entries first: columns only grow, so a reader seeing the new days also sees their entries
+        self.entries = {name: load(name, dtype, entry_count) for name, dtype in ENTRY_COLUMNS.items()}
+        self.days = {name: load(name, dtype, day_count) for name, dtype in DAY_COLUMNS.items()}
+
+    def _replace(self, path, write):
+        # A fresh temp file per call, so no two threads or processes ever write the same one
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+    def _write(self, name, column):
+        self._replace(self._column_path(name), lambda f: np.save(f, column))
+
+    def _write_meta(self, entry_count, day_count, xtx, xty, trained_days):
+        meta = {
+            "entries": entry_count,
+            "days": day_count,
+            "energies": self.energies.values,
+            "types": self.types.values,
+            "xtx": xtx.tolist(),
+            "xty": xty.tolist(),
+            "trained_days": trained_days,
+        }
+        self._replace(os.path.join(self.path, "meta.json"), lambda f: f.write(json.dumps(meta).encode()))
+
+    # -- Compaction --
+    def append(self, schedules, available_hours=None, priorities=None):
+        """
+        Archives {day: schedule} for the days after the last archived one; earlier days are skipped.
+
+        `available_hours` maps days to that day's available hours. Entries without a "priority"
+        field are looked up by task name in `priorities`. Returns the number of days added.
+        """
+        with self._lock:
+            return self._append(schedules, available_hours, priorities)
+
+    def _append(self, schedules, available_hours, priorities):
+        available_hours = {_ordinal(day): hours for day, hours in (available_hours or {}).items()}
+        priorities = priorities or {}
+        last = int(self.days["ordinal"][-1]) if len(self) else 0
+        new_days = sorted((_ordinal(day), schedule) for day, schedule in schedules.items() if _ordinal(day) > last)
+        if not new_days:
+            return 0
+
+        rows = {name: [] for name in ENTRY_COLUMNS}
+        ordinals, offsets, available = [], [], []
+        offset = len(self.entries["day"])
+        for position, (ordinal, schedule) in enumerate(new_days, len(self)):
+            ordinals.append(ordinal)
+            offsets.append(offset)
+            available.append(available_hours.get(ordinal, np.nan))
+            for entry in schedule:
+                start, end = entry_minutes(entry)
+                priority = entry.get("priority", priorities.get(entry.get("task")))
+                rows["day"].append(position)
+                rows["start"].append(start)
+                rows["end"].append(end)
+                rows["energy"].append(self.energies.code(str(entry.get("energy", "medium"))))
+                rows["type"].append(self.types.code(str(entry.get("task_type") or entry.get("type") or "Unknown")))
+                rows["priority"].append(np.nan if priority is None else priority)
+            offset += len(schedule)
+
+        new_entries = {name: np.asarray(rows[name], dtype=dtype) for name, dtype in ENTRY_COLUMNS.items()}
+        new_day_columns = {
+            "ordinal": np.asarray(ordinals, dtype=np.int32),
+            "offset": np.asarray(offsets, dtype=np.int64),
+            "available": np.asarray(available, dtype=np.float32),
+        }
+        xtx, xty, trained_days = self._train(
+            {**new_entries, "day": new_entries["day"] - len(self)},
+            new_day_columns["ordinal"],
+            new_day_columns["available"],
+        )
+
+        entries = {name: np.concatenate([self.entries[name], new_entries[name]]) for name in ENTRY_COLUMNS}
+        days = {name: np.concatenate([self.days[name], new_day_columns[name]]) for name in DAY_COLUMNS}
+        for name, column in {**entries, **days}.items():
+            self._write(name, column)
+        # Commits the append; nothing in memory changes until it has
+        self._write_meta(len(entries["day"]), len(days["ordinal"]), xtx, xty, trained_days)
+        self._xtx, self._xty, self.trained_days = xtx, xty, trained_days
+        self._open(len(entries["day"]), len(days["ordinal"]))
+        return len(new_days)
+
+    def compact(self, store, until=None):
+        """
+        Archives the store's days after the last archived one, up to `until` (default yesterday).
+
+        Today is left out by default because its schedule can still change.
+        """
+        until = until or date.today() - timedelta(days=1)
+        # Held from reading the last day to appending, so two sessions can't archive the same days
+        with self._lock:
+            start = self.last_day + timedelta(days=1) if len(self) else date.min
+            if start > until:
+                return 0
+            schedules = store.schedules_between(start, until)
+            if not schedules:
+                return 0
+            tasks, _ = store.load_tasks()
+            priorities = {task["name"]: task.get("priority") for task in tasks}
+            return self._append(schedules, store.available_hours_between(start, until), priorities)
+
+    # -- Queries --
+    def _slices(self, start=None, end=None):
+        # Day positions [lo, hi) and entry positions [entry_lo, entry_hi) covering start..end inclusive
+        ordinals = self.days["ordinal"]
+        lo = np.searchsorted(ordinals, _ordinal(start)) if start is not None else 0
+        hi = np.searchsorted(ordinals, _ordinal(end), side="right") if end is not None else len(ordinals)
+        offsets = self.days["offset"]
+        entry_lo = int(offsets[lo]) if lo < len(offsets) else len(self.entries["day"])
+        entry_hi = int(offsets[hi]) if hi < len(offsets) else len(self.entries["day"])
+        return int(lo), int(hi), entry_lo, entry_hi
+
+    def daily(self, start=None, end=None):
+        """
+        One value per archived day between `start` and `end` (inclusive, both optional).
+
+        Returns:
+        - Dict of NumPy arrays: "day" (datetime64[D]), "tasks", "hours", "available_hours",
+          "utilization" (hours / available hours), "mean_priority" and "score"
+          (productivity_score). Unknown values are NaN.
+        """
+        lo, hi, entry_lo, entry_hi = self._slices(start, end)
+        entries = {name: column[entry_lo:entry_hi] for name, column in self.entries.items()}
+        entries["day"] = entries["day"] - lo
+        return _daily(entries, self.days["ordinal"][lo:hi], self.days["available"][lo:hi])
+
+    def energy_mix(self, start=None, end=None):
+        # Share of scheduled hours per energy level
+        return self._mix("energy", self.energies, start, end)
+
+    def type_mix(self, start=None, end=None):
+        # Share of scheduled hours per task type
+        return self._mix("type", self.types, start, end)
+
+    def _mix(self, column, interner, start, end):
+        _, _, entry_lo, entry_hi = self._slices(start, end)
+        minutes = self.entries["end"][entry_lo:entry_hi] - self.entries["start"][entry_lo:entry_hi]
+        totals = np.bincount(self.entries[column][entry_lo:entry_hi], weights=minutes, minlength=len(interner.values))
+        total = totals.sum()
+        return {value: float(totals[code] / total) if total else 0.0 for code, value in enumerate(interner.values)}
+
+    def hourly_profile(self, start=None, end=None):
+        """
+        Average minutes scheduled in each hour of the day (24 values) over the archived days in range.
+        """
+        lo, hi, entry_lo, entry_hi = self._slices(start, end)
+        # Difference array over the minutes of the day: +1 where an entry starts, -1 where it ends
+        changes = np.zeros(24 * MINUTES_PER_HOUR + 1)
+        np.add.at(changes, self.entries["start"][entry_lo:entry_hi].astype(np.intp), 1)
+        np.add.at(changes, self.entries["end"][entry_lo:entry_hi].astype(np.intp), -1)
+        busy = np.cumsum(changes[:-1]).reshape(24, MINUTES_PER_HOUR).sum(axis=1)
+        return busy / (hi - lo) if hi > lo else busy
+
+    def priority_trend(self, window=7, start=None, end=None):
+        """
+        Rolling mean of the daily mean priority over the last `window` archived days (NaN days skipped).
+        """
+        values = self.daily(start, end)["mean_priority"]
+        known = ~np.isnan(values)
+        sums = np.cumsum(np.concatenate([[0], np.where(known, values, 0)]))
+        counts = np.cumsum(np.concatenate([[0], known]))
+        lower = np.maximum(np.arange(1, len(values) + 1) - window, 0)
+        totals = sums[1:] - sums[lower]
+        n = counts[1:] - counts[lower]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(n > 0, totals / n, np.nan)
+
+    # -- Productivity model --
+    def _train(self, entries, ordinals, available):
+        # Normal equations with the new days added; old days are never revisited
+        daily = _daily(entries, ordinals, available)
+        usable = ~np.isnan(daily["available_hours"]) & ~np.isnan(daily["score"])
+        x = _features(ordinals[usable], daily["available_hours"][usable])
+        return self._xtx + x.T @ x, self._xty + x.T @ daily["score"][usable], self.trained_days + int(usable.sum())
+
+    def predict_score(self, day, available_hours):
+        """
+        Predicted productivity_score for `day` with `available_hours`, or None before any training.
+
+        A ridge regression on the weekday and the available hours, fitted to every archived day
+        whose available hours are known.
+        """
+        if not self.trained_days:
+            return None
+        weights = np.linalg.solve(self._xtx + RIDGE * np.eye(FEATURES), self._xty)
+        prediction = _features([_ordinal(day)], [available_hours]) @ weights
+        return float(np.clip(prediction[0], 0, 100))
+
+
+def _daily(entries, ordinals, available):
+    # Per-day aggregates of entry columns whose "day" counts from 0 at ordinals[0]
+    days = len(ordinals)
+    day = entries["day"]
+    hours = (entries["end"] - entries["start"]) / MINUTES_PER_HOUR
+    priority = entries["priority"].astype(np.float64)
+    known = ~np.isnan(priority)
+
+    hours_used = np.bincount(day, weights=hours, minlength=days)
+    priority_sum = np.bincount(day, weights=np.where(known, priority, 0), minlength=days)
+    priority_count = np.bincount(day, weights=known, minlength=days)
+    weighted_hours = np.bincount(day, weights=np.where(known, priority * hours, 0), minlength=days)
+    available = available.astype(np.float64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {
+            "day": _dates(ordinals),
+            "tasks": np.bincount(day, minlength=days),
+            "hours": hours_used,
+            "available_hours": available,
+            "utilization": hours_used / available,
+            "mean_priority": np.where(priority_count > 0, priority_sum / priority_count, np.nan),
+            "score": productivity_score(weighted_hours, hours_used, available),
+        }
+
+
+def _ordinal(day):
+    if isinstance(day, date):
+        return day.toordinal()
+    return date.fromisoformat(str(day)).toordinal()
+
+
+def _dates(ordinals):
+    # date.toordinal() values as datetime64[D]
+    return (np.asarray(ordinals, dtype=np.int64) - date(1970, 1, 1).toordinal()).astype("datetime64[D]")
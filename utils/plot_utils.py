@@ -1,21 +1,127 @@
-import matplotlib.pyplot as plt
-from datetime import datetime
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+
 import streamlit as st
-import matplotlib.dates as mdates
 
-#Plotting timeline chart
-def plot_task_timeline(schedule):
-    fig, ax = plt.subplots(figsize=(10, 4))
-    base_time = datetime.strptime("08:00", "%H:%M")
+from scheduler.timeline import MINUTES_PER_HOUR, entry_hours, entry_minutes
+
+DAY_START_HOUR = 8
+
+#Rendered PNGs, keyed by a hash of the chart data; oldest dropped first
+CHART_CACHE_SIZE = 32
+_chart_cache = OrderedDict()
+_chart_cache_lock = threading.Lock()  # Every Streamlit session runs on its own thread
+
+
+#Chart data: plain lists, usable as JSON by clients that draw their own charts
+def timeline_data(schedule):
+    bars = []
+    for s in schedule:
+        start, end = entry_minutes(s)
+        bars.append({
+            "task": s["task"],
+            "start_hour": start / MINUTES_PER_HOUR - DAY_START_HOUR,
+            "hours": (end - start) / MINUTES_PER_HOUR,
+        })
+    return {"kind": "timeline", "bars": bars}
+
 
-    for task in schedule:
-        start = datetime.strptime(task["start"], "%H:%M")
-        end = datetime.strptime(task["end"], "%H:%M")
-        ax.barh(task["task"], (end - start).seconds / 3600, left=(start - base_time).seconds / 3600)
+def pie_data(schedule):
+    return {
+        "kind": "pie",
+        "labels": [s["task"] for s in schedule],
+        "sizes": [entry_hours(s) for s in schedule],
+    }
+
+
+def type_hours_data(schedule):
+    type_hours = {}
+    for s in schedule:
+        type_hours[s["task_type"]] = type_hours.get(s["task_type"], 0) + entry_hours(s)
+    return {"kind": "type_hours", "types": list(type_hours), "hours": list(type_hours.values())}
+
+
+def chart_key(data):
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+#Drawing, one function per chart kind
+def _draw_timeline(fig, data):
+    ax = fig.subplots()
+    for bar in data["bars"]:
+        ax.barh(bar["task"], bar["hours"], left=bar["start_hour"])
 
     ax.set_xlabel("Hours of Day")
     ax.set_ylabel("Tasks")
     ax.set_title("Task timeline")
-    ax.xaxis.set_major_locator(mdates.HourLocator(interval=1))
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
-    st.pyplot(fig, use_container_width=True)
\ No newline at end of file
+    #Ticks every hour, labelled with the clock time
+    last = max((bar["start_hour"] + bar["hours"] for bar in data["bars"]), default=1)
+    ticks = range(0, int(last) + 2)
+    ax.set_xticks(list(ticks))
+    ax.set_xticklabels([f"{DAY_START_HOUR + tick}:00" for tick in ticks])
+
+
+def _draw_pie(fig, data):
+    ax = fig.subplots()
+    ax.pie(data["sizes"], labels=data["labels"], autopct='%1.1f%%', startangle=90)
+    ax.axis('equal')
+
+
+def _draw_type_hours(fig, data):
+    ax = fig.subplots()
+    ax.bar(data["types"], data["hours"], color='skyblue')
+    ax.set_ylabel("Hours")
+    ax.set_xlabel("Task Type")
+
+
+_DRAW = {
+    "timeline": (_draw_timeline, (10, 4)),
+    "pie": (_draw_pie, None),
+    "type_hours": (_draw_type_hours, None),
+}
+
+
+def render_chart(data):
+    """
+    PNG bytes for a chart built by timeline_data, pie_data or type_hours_data.
+
+    Identical data is only drawn once. Figures are created outside pyplot, so nothing is
+    kept in a global figure registry, and each one is closed as soon as it is saved.
+    """
+    key = chart_key(data)
+    with _chart_cache_lock:
+        png = _chart_cache.get(key)
+        if png is not None:
+            _chart_cache.move_to_end(key)
+            return png
+
+    #Imported here so pages without charts never pay for matplotlib
+    from matplotlib.figure import Figure
+
+    draw, figsize = _DRAW[data["kind"]]
+    fig = Figure(figsize=figsize)
+    try:
+        draw(fig, data)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", bbox_inches="tight")
+        png = buffer.getvalue()
+    finally:
+        fig.clear()
+
+    with _chart_cache_lock:
+        _chart_cache[key] = png
+        while len(_chart_cache) > CHART_CACHE_SIZE:
+            _chart_cache.popitem(last=False)
+    return png
+
+
+def show_chart(data):
+    st.image(render_chart(data), use_container_width=True)
+
+
+#Plotting timeline chart
+def plot_task_timeline(schedule):
+    show_chart(timeline_data(schedule))
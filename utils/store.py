@@ -0,0 +1,203 @@
+import glob
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime
+
+DB_PATH = os.path.join("data", "time_optimizer.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    position INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_name ON tasks (name);
+CREATE TABLE IF NOT EXISTS schedules (
+    day TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (day, position)
+);
+CREATE TABLE IF NOT EXISTS days (
+    day TEXT PRIMARY KEY,
+    available_hours REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _dumps(obj):
+    # Compact JSON: no whitespace between items
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def _day(day):
+    if day is None:
+        return date.today().isoformat()
+    return day.isoformat() if isinstance(day, date) else str(day)
+
+
+class TaskStore:
+    """
+    SQLite storage for the task list and the daily schedules.
+
+    Every write runs in a single transaction, so a crash leaves either the old or the new
+    state, never a half-written file. Single tasks can be updated on their own, and schedules
+    are indexed by day so loading one day or a date range does not depend on how much history
+    has built up.
+
+    Tasks are kept by position, so a list with repeated names round-trips unchanged;
+    upsert_task and delete_task act on every task with the given name.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps the store safe to use from any thread
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _touch(self, conn):
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_updated', ?)",
+            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"),),
+        )
+
+    # -- Tasks --
+    def save_tasks(self, tasks):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM tasks")
+            conn.executemany(
+                "INSERT INTO tasks (position, name, data) VALUES (?, ?, ?)",
+                [(position, task["name"], _dumps(task)) for position, task in enumerate(tasks)],
+            )
+            self._touch(conn)
+
+    def upsert_task(self, task):
+        # Replaces every task with this name by `task`, at the first one's position
+        with self._connect() as conn:
+            row = conn.execute("SELECT MIN(position) FROM tasks WHERE name = ?", (task["name"],)).fetchone()
+            if row[0] is not None:
+                position = row[0]
+                conn.execute("DELETE FROM tasks WHERE name = ?", (task["name"],))
+            else:
+                position = conn.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM tasks").fetchone()[0]
+            conn.execute(
+                "INSERT INTO tasks (position, name, data) VALUES (?, ?, ?)",
+                (position, task["name"], _dumps(task)),
+            )
+            self._touch(conn)
+
+    def delete_task(self, name):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM tasks WHERE name = ?", (name,))
+            self._touch(conn)
+
+    def clear_tasks(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM tasks")
+            conn.execute("DELETE FROM meta WHERE key = 'last_updated'")
+
+    def load_tasks(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT data FROM tasks ORDER BY position").fetchall()
+            meta = conn.execute("SELECT value FROM meta WHERE key = 'last_updated'").fetchone()
+        return [json.loads(data) for (data,) in rows], meta[0] if meta else "Unknown"
+
+    # -- Schedules --
+    def save_schedule(self, schedule, day=None, available_hours=None):
+        # available_hours, when given, is kept for the day so its utilization can be computed later
+        day = _day(day)
+        with self._connect() as conn:
+            conn.execute("DELETE FROM schedules WHERE day = ?", (day,))
+            conn.executemany(
+                "INSERT INTO schedules (day, position, data) VALUES (?, ?, ?)",
+                [(day, position, _dumps(entry)) for position, entry in enumerate(schedule)],
+            )
+            if available_hours is not None:
+                self._save_available_hours(conn, day, available_hours)
+
+    def save_available_hours(self, day, available_hours):
+        with self._connect() as conn:
+            self._save_available_hours(conn, _day(day), available_hours)
+
+    def _save_available_hours(self, conn, day, available_hours):
+        conn.execute("INSERT OR REPLACE INTO days (day, available_hours) VALUES (?, ?)", (day, available_hours))
+
+    def load_schedule(self, day=None):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT data FROM schedules WHERE day = ? ORDER BY position", (_day(day),)
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def schedules_between(self, start, end):
+        """
+        Schedules for every stored day from `start` to `end` inclusive, as {day: schedule}.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT day, data FROM schedules WHERE day BETWEEN ? AND ? ORDER BY day, position",
+                (_day(start), _day(end)),
+            ).fetchall()
+        schedules = {}
+        for day, data in rows:
+            schedules.setdefault(day, []).append(json.loads(data))
+        return schedules
+
+    def available_hours_between(self, start, end):
+        # {day: available_hours} for the days in range that were saved with one
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT day, available_hours FROM days WHERE day BETWEEN ? AND ?", (_day(start), _day(end))
+            ).fetchall()
+        return dict(rows)
+
+    def import_json_files(self, data_dir):
+        """
+        One-off migration of saved_tasks.json and schedule_YYYYMMDD.json files into the store.
+
+        Days and tasks that are already in the store are left alone, and once the migration has
+        run it is not repeated.
+        """
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone():
+                return
+
+        saved_path = os.path.join(data_dir, "saved_tasks.json")
+        if os.path.exists(saved_path) and not self.load_tasks()[0]:
+            with open(saved_path, "r") as f:
+                data = json.load(f)
+            tasks = data.get("tasks", []) if isinstance(data, dict) else data
+            self.save_tasks(tasks)
+
+        for path in sorted(glob.glob(os.path.join(data_dir, "schedule_*.json"))):
+            stamp = os.path.basename(path)[len("schedule_"):-len(".json")]
+            try:
+                day = datetime.strptime(stamp, "%Y%m%d").date()
+            except ValueError:
+                continue
+            if self.load_schedule(day):
+                continue
+            with open(path, "r") as f:
+                self.save_schedule(json.load(f), day)
+
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', ?)", (datetime.now().isoformat(),))
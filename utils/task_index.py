@@ -0,0 +1,149 @@
+class TaskIndex:
+    """
+    Inverted index from tags, types, names and durations to bitmaps of task ids.
+
+    Bitmaps are Python ints (bit i set = task i matches), so AND/OR queries are single integer
+    operations and results come back in task id order, which is the order tasks were given.
+    Tags and types are indexed both as written and lowercased, to serve the case-sensitive
+    schedule filters and the case-insensitive focus tag alike.
+
+    Works for task dicts and for schedule entries: pass name_key="task", type_key="task_type".
+    """
+
+    def __init__(self, items=(), name_key="name", type_key="type"):
+        self.name_key = name_key
+        self.type_key = type_key
+        self.items = []
+        self.all = 0
+        self._tags = {}
+        self._folded_tags = {}
+        self._types = {}
+        self._folded_types = {}
+        self._names = {}
+        self._durations = {}
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return bin(self.all).count("1")
+
+    # -- Updates --
+    def add(self, item):
+        task_id = len(self.items)
+        self.items.append(None)
+        self.update(task_id, item)
+        return task_id
+
+    def update(self, task_id, item):
+        if self.items[task_id] is not None:
+            self.remove(task_id)
+        self.items[task_id] = item
+        bit = 1 << task_id
+        self.all |= bit
+        for index, key in self._keys(item):
+            index[key] = index.get(key, 0) | bit
+
+    def remove(self, task_id):
+        item = self.items[task_id]
+        if item is None:
+            return
+        bit = 1 << task_id
+        self.all &= ~bit
+        for index, key in self._keys(item):
+            index[key] &= ~bit
+            if not index[key]:
+                del index[key]
+        self.items[task_id] = None
+
+    def sync(self, items):
+        """
+        Makes task i equal items[i], touching only the positions that changed.
+        """
+        items = list(items)
+        for task_id, item in enumerate(items):
+            if task_id >= len(self.items):
+                self.add(item)
+            elif self.items[task_id] != item:
+                self.update(task_id, item)
+        for task_id in range(len(items), len(self.items)):
+            self.remove(task_id)
+        del self.items[len(items):]
+
+    def _keys(self, item):
+        tags = item.get("tags", [])
+        if isinstance(tags, str):
+            tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
+        keys = [(self._names, item.get(self.name_key))]
+        keys += [(self._tags, tag) for tag in set(tags)]
+        keys += [(self._folded_tags, tag) for tag in {tag.lower() for tag in tags}]
+        if self.type_key in item:
+            keys.append((self._types, item[self.type_key]))
+            keys.append((self._folded_types, str(item[self.type_key]).lower()))
+        if "duration" in item:
+            keys.append((self._durations, item["duration"]))
+        return keys
+
+    # -- Bitmaps --
+    def with_tag(self, tag, ignore_case=False):
+        return self._folded_tags.get(tag.lower(), 0) if ignore_case else self._tags.get(tag, 0)
+
+    def with_any_tag(self, tags, ignore_case=False):
+        bitmap = 0
+        for tag in tags:
+            bitmap |= self.with_tag(tag, ignore_case)
+        return bitmap
+
+    def with_all_tags(self, tags, ignore_case=False):
+        bitmap = self.all
+        for tag in tags:
+            bitmap &= self.with_tag(tag, ignore_case)
+        return bitmap
+
+    def of_type(self, task_type, ignore_case=False):
+        return self._folded_types.get(task_type.lower(), 0) if ignore_case else self._types.get(task_type, 0)
+
+    def of_any_type(self, task_types, ignore_case=False):
+        bitmap = 0
+        for task_type in task_types:
+            bitmap |= self.of_type(task_type, ignore_case)
+        return bitmap
+
+    def named(self, names):
+        bitmap = 0
+        for name in names:
+            bitmap |= self._names.get(name, 0)
+        return bitmap
+
+    def at_most(self, max_duration):
+        # One OR per distinct duration, of which there are only a handful
+        bitmap = 0
+        for duration, ids in self._durations.items():
+            if duration <= max_duration:
+                bitmap |= ids
+        return bitmap
+
+    def select(self, bitmap):
+        """
+        The items whose bits are set, in id order.
+        """
+        bits = bin(bitmap & self.all)[:1:-1]  # Lowest bit first
+        items = []
+        task_id = bits.find("1")
+        while task_id != -1:
+            items.append(self.items[task_id])
+            task_id = bits.find("1", task_id + 1)
+        return items
+
+    # -- Queries matching utils/task_utils.py --
+    def smart_suggestions(self, used_tasks, unused_time, focus_tag):
+        bitmap = self.at_most(unused_time) & ~self.named(used_tasks)
+        focus_tag_lower = focus_tag.strip().lower()
+        if focus_tag_lower:
+            bitmap &= self.with_tag(focus_tag_lower, ignore_case=True)
+        return self.select(bitmap)
+
+    def by_type_and_tags(self, selected_types, selected_tags):
+        bitmap = self.of_any_type(selected_types)
+        if selected_tags:
+            bitmap &= self.with_any_tag(selected_tags)
+        return self.select(bitmap)
@@ -1,14 +1,37 @@
+import math
+
+import numpy as np
+
+from scheduler.tasks import TaskTable
+from utils.task_index import TaskIndex
+
 # Tasks filter by type
 def filter_schedule_by_type(schedule, selected_type):
+    if isinstance(schedule, TaskIndex):
+        return schedule.select(schedule.of_type(selected_type, ignore_case=True) if selected_type != "All" else schedule.all)
+    if isinstance(schedule, TaskTable):
+        return schedule.take(schedule.has_type(selected_type)) if selected_type != "All" else schedule
     return [task for task in schedule if task["type"].lower() == selected_type.lower()] if selected_type != "All" else schedule
 
 # Tasks filter by matching tags
 def filter_by_tags(schedule, selected_tags):
+    if isinstance(schedule, TaskIndex):
+        return schedule.select(schedule.with_any_tag(selected_tags))
+    if isinstance(schedule, TaskTable):
+        return schedule.take(schedule.has_any_tag(selected_tags))
     return [s for s in schedule if any(tag in selected_tags for tag in s.get("tags", []))]
 
 # Smart suggestions generated based on tag, unused time, and used tasks
 def get_smart_suggestions(tasks, used_tasks, unused_time, focus_tag):
+    if isinstance(tasks, TaskIndex):
+        return tasks.smart_suggestions(used_tasks, unused_time, focus_tag)
     focus_tag_lower = focus_tag.strip().lower()
+    if isinstance(tasks, TaskTable):
+        used_tasks = set(used_tasks)
+        mask = (tasks.duration <= unused_time) & np.array([name not in used_tasks for name in tasks.names], dtype=bool)
+        if focus_tag_lower:
+            mask &= tasks.has_tag(focus_tag_lower)
+        return tasks.take(mask)
     return [
         t for t in tasks
         if t["name"] not in used_tasks
@@ -23,15 +46,53 @@ def filter_schedule_by_type_and_tags(schedule, selected_types, selected_tags):
     Filters the schedule based on selected task types and tags.
 
     Parameters:
-    - schedule: List of task dictionaries with 'task_type' and 'tags'.
+    - schedule: List of task dictionaries with 'task_type' and 'tags', or a TaskIndex over them.
     - selected_types: List of task types to include.
     - selected_tags: List of tags to include.
 
     Returns:
     - Filtered schedule list.
     """
+    if isinstance(schedule, TaskIndex):
+        return schedule.by_type_and_tags(selected_types, selected_tags)
     return [
         s for s in schedule
         if s["task_type"] in selected_types and
            (not selected_tags or any(tag in selected_tags for tag in s.get("tags", [])))
     ]
+
+# Validates a raw task dict (e.g. one JSONL line) and normalizes it to the shape the scheduler expects
+def normalize_task(raw):
+    if not isinstance(raw, dict):
+        raise ValueError("task must be a JSON object")
+    missing = [key for key in ("name", "duration", "priority", "energy") if key not in raw]
+    if missing:
+        raise ValueError(f"task is missing {', '.join(missing)}")
+
+    task = dict(raw)
+    task["name"] = str(raw["name"])
+    try:
+        task["duration"] = float(raw["duration"])
+        task["priority"] = float(raw["priority"])
+    except (TypeError, ValueError):
+        raise ValueError(f"task '{task['name']}' has a non-numeric duration or priority")
+    # json.loads accepts NaN and Infinity, which would slip past the checks below
+    if not (math.isfinite(task["duration"]) and math.isfinite(task["priority"])):
+        raise ValueError(f"task '{task['name']}' has a non-finite duration or priority")
+    # Keep whole numbers as ints so output matches hand-written task files
+    for key in ("duration", "priority"):
+        if task[key].is_integer():
+            task[key] = int(task[key])
+    if task["duration"] <= 0:
+        raise ValueError(f"task '{task['name']}' has a non-positive duration")
+
+    task["energy"] = str(raw["energy"]).strip().lower()
+    if task["energy"] not in ("high", "medium", "low"):
+        raise ValueError(f"task '{task['name']}' has unknown energy '{raw['energy']}'")
+
+    tags = raw.get("tags", [])
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    task["tags"] = [str(tag).strip() for tag in tags if str(tag).strip()]
+    task["type"] = str(raw.get("type", "Personal"))
+    return task
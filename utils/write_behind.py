@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehind:
+    """
+    Runs writes on a background thread, so callers never wait for the disk.
+
+    Every write has a key naming what it overwrites, e.g. "tasks" or ("schedule", day). A new
+    write for a key that is still pending replaces the old one and moves to the back of the
+    queue, so writes still happen in the order they were last requested and only the latest
+    of a burst reaches the disk. The queue is written out once `debounce` seconds pass without
+    a new write, or `max_delay` seconds after its oldest write was queued, whichever is first.
+
+    Call flush() before reading something that may still be queued, and close() on shutdown.
+    """
+
+    def __init__(self, debounce=0.5, max_delay=2.0, latency_window=1000):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._pending = OrderedDict()
+        self._first_queued = None
+        self._last_queued = None
+        self._flushing = False
+        self._writing = False
+        self._closed = False
+        self._condition = threading.Condition()
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.writes = 0
+        self.failures = 0
+        self._latencies = deque(maxlen=latency_window)
+        self._latency_total = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, key, write, *args):
+        # Queues write(*args); returns at once
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("write-behind queue is closed")
+            if key in self._pending:
+                del self._pending[key]
+                self.coalesced += 1
+            self._pending[key] = (write, args)
+            now = time.monotonic()
+            if self._first_queued is None:
+                self._first_queued = now
+            self._last_queued = now
+            self.submitted += 1
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Writes everything queued now and waits for it. Returns False if `timeout` ran out first.
+        """
+        with self._condition:
+            self._flushing = bool(self._pending)
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    def close(self, timeout=10):
+        # Flushes and stops the thread; registered with atexit by utils.file_utils
+        flushed = self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        if not flushed:
+            logger.warning("write-behind queue closed with %d writes still pending", len(self._pending))
+        return flushed
+
+    def stats(self):
+        with self._condition:
+            latencies = sorted(self._latencies)
+            return {
+                "queue_depth": len(self._pending),
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "writes": self.writes,
+                "failures": self.failures,
+                "write_latency_ms": {
+                    "mean": round(self._latency_total / self.writes * 1000, 3) if self.writes else 0,
+                    "p95": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 3) if latencies else 0,
+                    "max": round(latencies[-1] * 1000, 3) if latencies else 0,
+                },
+            }
+
+    def _due(self):
+        if self._flushing:
+            return float("-inf")
+        return min(self._last_queued + self.debounce, self._first_queued + self.max_delay)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed and (not self._pending or time.monotonic() < self._due()):
+                    self._condition.wait(None if not self._pending else max(0, self._due() - time.monotonic()))
+                if not self._pending:
+                    return
+                batch = list(self._pending.values())
+                self._pending.clear()
+                self._first_queued = self._last_queued = None
+                self._flushing = False
+                self._writing = True
+
+            for write, args in batch:
+                started = time.perf_counter()
+                try:
+                    write(*args)
+                    ok = True
+                except Exception:
+                    logger.exception("write-behind write failed")
+                    ok = False
+                elapsed = time.perf_counter() - started
+                with self._condition:
+                    self.writes += ok
+                    self.failures += not ok
+                    if ok:
+                        self._latencies.append(elapsed)
+                        self._latency_total += elapsed
+
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()